@@ -12,12 +12,24 @@ Requirements:
 """
 
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+import codecs
+import concurrent.futures
+import functools
+import hashlib
+import io
+import logging
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
-import json
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+import pyarrow.json as paj
+from datetime import datetime
 from pathlib import Path
 import glob
 from typing import Dict, List, Optional
@@ -86,18 +98,32 @@ class DrillDownManager:
         
         # Update current level
         if st.session_state.drill_down_filters:
-            st.session_state.current_level = list(st.session_state.drill_down_filters.keys())[-1]
+            st.session_state.current_level = next(reversed(st.session_state.drill_down_filters))
         else:
             st.session_state.current_level = 'overview'
     
     @staticmethod
     def apply_filters(df: pd.DataFrame) -> pd.DataFrame:
         """Apply all active drill-down filters to dataframe"""
-        filtered_df = df.copy()
+        if not st.session_state.drill_down_filters:
+            return df
+        
+        # Combine every filter into one mask and slice once
+        mask = np.ones(len(df), dtype=bool)
         for filter_type, filter_value in st.session_state.drill_down_filters.items():
-            if filter_type in filtered_df.columns:
-                filtered_df = filtered_df[filtered_df[filter_type] == filter_value]
-        return filtered_df
+            if filter_type not in df.columns:
+                continue
+            column = df[filter_type]
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                # Compare integer codes instead of the category values
+                categories = column.cat.categories
+                if filter_value in categories:
+                    mask &= column.cat.codes.to_numpy() == categories.get_loc(filter_value)
+                else:
+                    mask[:] = False
+            else:
+                mask &= (column == filter_value).to_numpy(dtype=bool, na_value=False)
+        return df.loc[mask]
     
     @staticmethod
     def render_breadcrumb():
@@ -112,7 +138,7 @@ class DrillDownManager:
                 if st.button("🔙 返回上一級", key="back_button"):
                     if len(st.session_state.breadcrumb) > 1:
                         # Remove last filter
-                        last_filter = list(st.session_state.drill_down_filters.keys())[-1] if st.session_state.drill_down_filters else None
+                        last_filter = next(reversed(st.session_state.drill_down_filters)) if st.session_state.drill_down_filters else None
                         if last_filter:
                             DrillDownManager.remove_filter(last_filter)
                         st.rerun()
@@ -124,23 +150,156 @@ class DrillDownManager:
             
             st.divider()
 
+# Columns used by clean_data and the dashboard; everything else is skipped at read time
+KEEP_COLS = [
+    'item_id', 'brand', 'series', 'model', 'year', 'mileage_km', 'price_ntd',
+    'region', 'color', 'fuel', 'transmission', 'title', 'views_today', 'views_total'
+]
+
+# Raw 8891 API fields and their standard (CSV) column names
+RAW_FIELD_MAPPING = {
+    'itemId': 'item_id',
+    'brandEnName': 'brand',
+    'kindEnName': 'series',
+    'modelEnName': 'model',
+    'makeYear': 'year',
+    'mileage': 'mileage_km',
+    'price': 'price_ntd',
+    'region': 'region',
+    'color': 'color',
+    'gas': 'fuel',
+    'tab': 'transmission',
+    'title': 'title',
+    'dayViewNum': 'views_today',
+    'totalViewNum': 'views_total'
+}
+
+# Compact dtypes applied after cleaning: nullable ints for numerics, category for low-cardinality text
+INT_DTYPES = {
+    'year': 'Int16',
+    'mileage_km': 'Int32',
+    'price_ntd': 'Int32',
+    'views_today': 'Int32',
+    'views_total': 'Int32'
+}
+# model is empty in most crawled rows; a file with none left is kept as strings (see optimize_dtypes)
+CATEGORY_COLS = ['brand', 'series', 'model', 'region', 'fuel', 'transmission', 'color']
+NUMERIC_COLS = ['year', 'mileage_km', 'price_ntd', 'views_today', 'views_total']
+TEXT_COLS = ['title']
+
+DRILL_DOWN_OPTIONS = {
+    '品牌分析': ['brand', 'series', 'model'],
+    '地區分析': ['region'],
+    '年份分析': ['year'],
+    '價格分析': ['price_ntd'],
+    '燃料類型': ['fuel'],
+    '變速箱': ['transmission'],
+    '顏色': ['color']
+}
+
+# Columns matched by the data table search
+SEARCH_COLS = ['title', 'brand', 'model', 'series']
+
+# Main analysis tabs, in display order
+MAIN_TABS = ["🔍 互動鑽取", "🌳 樹狀圖", "📊 價格分析", "🔍 年份價格", "🏢 品牌比較", "📍 地區分析"]
+
+# Scatter plots above this many rows are drawn from a stratified sample
+SCATTER_MAX_POINTS = 10000
+
+# Bump when clean_data changes the schema stored in the parquet cache
+CACHE_VERSION = 4
+
 class CarDataLoader:
     """Load and process car data from various sources"""
     
     def __init__(self, data_dir: str = "./data"):
         self.data_dir = Path(data_dir)
+        self.csv_signature = _file_signature(self.csv_files())
+        self.json_signature = _file_signature(self.jsonl_files())
+    
+    def csv_files(self) -> List[Path]:
+        """List CSV source files"""
+        return sorted(self.data_dir.glob("*.csv"))
+    
+    def jsonl_files(self) -> List[Path]:
+        """List raw JSONL source files (plain or gzipped)"""
+        raw_dir = self.data_dir / "raw"
+        if not raw_dir.exists():
+            return []
+        return sorted([*raw_dir.rglob("*.jsonl"), *raw_dir.rglob("*.jsonl.gz")])
     
     def load_csv_data(self) -> pd.DataFrame:
-        """Load data from CSV files"""
-        csv_files = list(self.data_dir.glob("*.csv"))
-        if not csv_files:
+        """Load data from CSV files (cached until the files change)"""
+        if not self.csv_signature:
             return pd.DataFrame()
+        return _cached_csv_data(str(self.data_dir), self.csv_signature)
+    
+    def load_raw_json_data(self) -> pd.DataFrame:
+        """Load data from raw JSONL files (cached until the files change)"""
+        if not self.json_signature:
+            return pd.DataFrame()
+        return _cached_json_data(str(self.data_dir), self.json_signature)
+    
+    def load_merged_data(self) -> pd.DataFrame:
+        """Load CSV and raw JSONL data combined (cached until the files change)"""
+        return _cached_merged_data(str(self.data_dir), self.csv_signature, self.json_signature)
+    
+    def load_parquet_cache(self, name: str, signature: tuple, build) -> pd.DataFrame:
+        """Return the cleaned frame from ./data/_cache_<name>.parquet, rebuilding it when the sources changed"""
+        cache_path = self.data_dir / f"_cache_{name}.parquet"
+        sig_path = self.data_dir / f"_cache_{name}.sig"
+        sig_hash = hashlib.sha1(repr((CACHE_VERSION, signature)).encode('utf-8')).hexdigest()
+        
+        if cache_path.exists() and sig_path.exists() and sig_path.read_text(encoding='utf-8') == sig_hash:
+            try:
+                return pd.read_parquet(cache_path, engine='pyarrow')
+            except Exception:
+                pass  # Corrupt or unreadable cache, rebuild below
+        
+        df = build()
+        if not df.empty:
+            if 'item_id' in df.columns and df['item_id'].dtype == object:
+                # Demo ids (demo_000001) next to crawled integer ids; Parquet needs one type
+                df = df.assign(item_id=df['item_id'].astype(str).astype('string[pyarrow]'))
+            try:
+                sig_path.unlink(missing_ok=True)
+                df.to_parquet(cache_path, engine='pyarrow', compression='snappy', index=False)
+                sig_path.write_text(sig_hash, encoding='utf-8')
+            except Exception as e:
+                # The cache is only an optimization, so keep the UI quiet and just log it
+                logging.warning(f"無法寫入快取檔案 {cache_path.name}: {e}")
+        return df
+    
+    def read_csv_files(self, csv_files: List[Path]) -> pd.DataFrame:
+        """Read and clean the given CSV files"""
+        try:
+            # One multi-threaded scan over all files when their column types agree
+            # strings_can_be_null matches pandas, which reads empty cells as missing
+            csv_format = ds.CsvFileFormat(convert_options=pacsv.ConvertOptions(strings_can_be_null=True))
+            paths = [str(file) for file in csv_files]
+            # A dataset otherwise takes its schema from the first file only; unifying the
+            # per-file schemas keeps columns that only later crawls have (null-filled elsewhere)
+            schema = pa.unify_schemas([ds.dataset(path, format=csv_format).schema for path in paths])
+            dataset = ds.dataset(paths, schema=schema, format=csv_format)
+            columns = [col for col in KEEP_COLS if col in schema.names]
+            table = dataset.to_table(columns=columns, use_threads=True)
+            return self.clean_data(table.to_pandas(types_mapper=pd.ArrowDtype))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            pass
         
         all_data = []
         for file in csv_files:
             try:
-                df = pd.read_csv(file, encoding='utf-8-sig')
-                df['source_file'] = file.stem
+                # Schemas vary between crawls, so project onto the columns this file has
+                header = pd.read_csv(file, encoding='utf-8-sig', nrows=0).columns
+                usecols = [col for col in KEEP_COLS if col in header]
+                df = pd.read_csv(
+                    file,
+                    encoding='utf-8-sig',
+                    engine='pyarrow',
+                    usecols=usecols,
+                    dtype_backend='pyarrow'
+                )
                 all_data.append(df)
             except Exception as e:
                 st.warning(f"無法讀取檔案 {file.name}: {e}")
@@ -151,31 +310,23 @@ class CarDataLoader:
         combined_df = pd.concat(all_data, ignore_index=True)
         return self.clean_data(combined_df)
     
-    def load_raw_json_data(self) -> pd.DataFrame:
-        """Load data from raw JSONL files"""
-        raw_dir = self.data_dir / "raw"
-        if not raw_dir.exists():
-            return pd.DataFrame()
-        
-        jsonl_files = list(raw_dir.rglob("*.jsonl"))
-        if not jsonl_files:
-            return pd.DataFrame()
-        
-        all_data = []
+    def read_jsonl_files(self, jsonl_files: List[Path]) -> pd.DataFrame:
+        """Read and normalize the given raw JSONL files"""
+        read_options = paj.ReadOptions(use_threads=True, block_size=1 << 20)
+        tables = []
         for file in jsonl_files:
             try:
-                with open(file, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        if line.strip():
-                            data = json.loads(line)
-                            all_data.append(data)
+                table = paj.read_json(str(file), read_options=read_options)
+                # Drop nested/unused fields early so schemas line up across files
+                tables.append(table.select([col for col in RAW_FIELD_MAPPING if col in table.column_names]))
             except Exception as e:
                 st.warning(f"無法讀取原始檔案 {file.name}: {e}")
         
-        if not all_data:
+        if not tables:
             return pd.DataFrame()
         
-        df = pd.DataFrame(all_data)
+        table = pa.concat_tables(tables, promote_options='default')
+        df = table.to_pandas(types_mapper=pd.ArrowDtype)
         return self.normalize_raw_data(df)
     
     def clean_data(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -193,69 +344,444 @@ class CarDataLoader:
             if col in df.columns:
                 df[col] = pd.to_numeric(df[col], errors='coerce')
         
-        # Filter reasonable values
+        # Filter reasonable values with one combined mask
+        mask = pd.Series(True, index=df.index)
         if 'year' in df.columns:
-            df = df[(df['year'] >= 1990) & (df['year'] <= 2025)]
+            mask &= (df['year'] >= 1990) & (df['year'] <= 2025)
         if 'price_ntd' in df.columns:
-            df = df[(df['price_ntd'] > 0) & (df['price_ntd'] < 10000000)]  # 0-1000萬
+            mask &= (df['price_ntd'] > 0) & (df['price_ntd'] < 10000000)  # 0-1000萬
         if 'mileage_km' in df.columns:
-            df = df[df['mileage_km'] >= 0]
+            mask &= df['mileage_km'] >= 0
+        df = df.loc[mask]
         
-        return df
+        return self.optimize_dtypes(df)
+    
+    def optimize_dtypes(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Downcast numerics to nullable ints, low-cardinality text to category, other text to Arrow strings"""
+        dtypes = {}
+        rounded = {}
+        for col, dtype in INT_DTYPES.items():
+            if col in df.columns:
+                values = df[col].round()
+                max_abs = values.abs().max()
+                # Leave columns alone if stray values would overflow the narrow type
+                if pd.isna(max_abs) or max_abs <= np.iinfo(dtype.lower()).max:
+                    rounded[col] = values
+                    dtypes[col] = dtype
+        for col in CATEGORY_COLS:
+            if col in df.columns:
+                # An all-empty column (Arrow reads it as null type) has no categories to infer
+                dtypes[col] = 'string[pyarrow]' if df[col].isna().all() else 'category'
+        for col in TEXT_COLS:
+            if col in df.columns:
+                dtypes[col] = 'string[pyarrow]'
+        return df.assign(**rounded).astype(dtypes)
     
     def normalize_raw_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """Normalize raw JSON data to match CSV format"""
         if df.empty:
             return df
         
-        # Map raw fields to standard format
-        field_mapping = {
-            'itemId': 'item_id',
-            'brandEnName': 'brand',
-            'kindEnName': 'series',
-            'modelEnName': 'model',
-            'makeYear': 'year',
-            'mileage': 'mileage_km',
-            'price': 'price_ntd',
-            'region': 'region',
-            'color': 'color',
-            'gas': 'fuel',
-            'tab': 'transmission',
-            'title': 'title',
-            'dayViewNum': 'views_today',
-            'totalViewNum': 'views_total'
-        }
-        
-        # Rename columns
-        for old_name, new_name in field_mapping.items():
-            if old_name in df.columns:
-                df[new_name] = df[old_name]
-        
-        # Keep only relevant columns
-        relevant_columns = list(field_mapping.values())
-        df = df[[col for col in relevant_columns if col in df.columns]]
+        # Map raw fields to standard format and keep only the mapped columns
+        df = df.rename(columns=RAW_FIELD_MAPPING)
+        df = df.loc[:, [col for col in RAW_FIELD_MAPPING.values() if col in df.columns]]
         
         return self.clean_data(df)
+    
+    def merge_data(self, csv_df: pd.DataFrame, json_df: pd.DataFrame) -> pd.DataFrame:
+        """Combine CSV and raw JSON data, preferring CSV rows on duplicate item_id"""
+        if not csv_df.empty and not json_df.empty:
+            # Both sides are already deduplicated, so only drop JSON rows whose item_id the CSV has
+            if 'item_id' in csv_df.columns and 'item_id' in json_df.columns:
+                json_df = json_df[~json_df['item_id'].isin(pd.Index(csv_df['item_id']))]
+            return pd.concat([csv_df, json_df], ignore_index=True)
+        if not csv_df.empty:
+            return csv_df
+        if not json_df.empty:
+            return json_df
+        return pd.DataFrame()
+
+def _file_signature(files: List[Path]) -> tuple:
+    """Build a cache key that changes whenever any of the files is added, removed or modified"""
+    signature = []
+    for path in files:
+        stat = path.stat()
+        signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+def _value_counts(series: pd.Series) -> pd.Series:
+    """value_counts without the zero-count entries a filtered categorical column keeps"""
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return series.value_counts()
+    
+    # Categoricals: bincount the integer codes (-1 is missing) instead of hashing values
+    categories = series.cat.categories
+    codes = series.cat.codes.to_numpy()
+    counts = np.bincount(codes[codes >= 0], minlength=len(categories))
+    order = np.argsort(-counts, kind='stable')
+    order = order[counts[order] > 0]
+    index = pd.CategoricalIndex(
+        categories[order], categories=categories, ordered=series.cat.ordered, name=series.name
+    )
+    return pd.Series(counts[order], index=index, name='count')
+
+@st.cache_data(show_spinner=False)
+def _cached_csv_data(data_dir: str, signature: tuple) -> pd.DataFrame:
+    """Cached CSV load, keyed on the file signature"""
+    loader = CarDataLoader(data_dir)
+    return loader.load_parquet_cache(
+        'csv', signature,
+        lambda: loader.read_csv_files([Path(p) for p, _, _ in signature])
+    )
+
+@st.cache_data(show_spinner=False)
+def _cached_json_data(data_dir: str, signature: tuple) -> pd.DataFrame:
+    """Cached raw JSONL load, keyed on the file signature"""
+    loader = CarDataLoader(data_dir)
+    return loader.load_parquet_cache(
+        'json', signature,
+        lambda: loader.read_jsonl_files([Path(p) for p, _, _ in signature])
+    )
+
+@st.cache_data(show_spinner=False)
+def _cached_merged_data(data_dir: str, csv_signature: tuple, json_signature: tuple) -> pd.DataFrame:
+    """Cached merge of CSV and raw JSONL data, keyed on both file signatures"""
+    loader = CarDataLoader(data_dir)
+    
+    def build() -> pd.DataFrame:
+        csv_df = _cached_csv_data(data_dir, csv_signature) if csv_signature else pd.DataFrame()
+        json_df = _cached_json_data(data_dir, json_signature) if json_signature else pd.DataFrame()
+        return loader.merge_data(csv_df, json_df)
+    
+    return loader.load_parquet_cache('merged', csv_signature + json_signature, build)
+
+@functools.lru_cache(maxsize=None)
+def _drill_down_options(columns: frozenset) -> Dict[str, List[str]]:
+    """Drill-down categories whose columns exist; depends only on the column set"""
+    available_options = {}
+    for category, category_columns in DRILL_DOWN_OPTIONS.items():
+        available_columns = [col for col in category_columns if col in columns]
+        if available_columns:
+            available_options[category] = available_columns
+    return available_options
+
+@functools.lru_cache(maxsize=None)
+def _available_columns(columns: frozenset) -> Dict[str, List[str]]:
+    """Numeric, categorical and treemap-level columns present in the column set"""
+    categorical = [col for col in CATEGORY_COLS if col in columns]
+    return {
+        'numeric': [col for col in NUMERIC_COLS if col in columns],
+        'categorical': categorical,
+        'levels': categorical + (['year'] if 'year' in columns else [])
+    }
+
+# Aggregation helpers for CarDataAnalyzer. They only return small aggregated
+# frames so the results can be cached and the figures rebuilt from them.
+
+@st.cache_resource
+def _prefetch_executor() -> concurrent.futures.ThreadPoolExecutor:
+    """Process-wide pool for cache warm-ups; a resource so reruns reuse it instead of leaking threads"""
+    return concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix='prefetch')
+
+def _run_with_script_ctx(ctx, func, *args):
+    """Run func in a pool thread attached to the submitting script run, so st.cache_data works"""
+    add_script_run_ctx(ctx=ctx)
+    return func(*args)
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _cached_aggregate(_df: pd.DataFrame, _func, cache_key: tuple, *args):
+    """Cached aggregation; the frame is identified by cache_key instead of being hashed"""
+    return _func(_df, *args)
+
+def _agg_summary_stats(df: pd.DataFrame) -> Dict:
+    """Overall summary statistics"""
+    return {
+        'total_cars': len(df),
+        'avg_price': df['price_ntd'].mean() if 'price_ntd' in df.columns else 0,
+        'avg_year': df['year'].mean() if 'year' in df.columns else 0,
+        'avg_mileage': df['mileage_km'].mean() if 'mileage_km' in df.columns else 0,
+        'brands_count': df['brand'].nunique() if 'brand' in df.columns else 0,
+        'regions_count': df['region'].nunique() if 'region' in df.columns else 0
+    }
+
+def _agg_treemap(df: pd.DataFrame, group_by: str, value_col: str) -> pd.DataFrame:
+    """Count / mean / sum of value_col per group_by"""
+    if value_col in df.columns:
+        grouped = df.groupby(group_by, observed=True).agg({
+            value_col: ['count', 'mean', 'sum']
+        }).round(0)
+        grouped.columns = ['count', 'avg_value', 'total_value']
+    else:
+        grouped = df.groupby(group_by, observed=True).size().to_frame('count')
+        grouped['avg_value'] = 0
+        grouped['total_value'] = grouped['count']
+    return grouped.reset_index()
+
+def _agg_brand_comparison(df: pd.DataFrame) -> pd.DataFrame:
+    """Per-brand count, price, year and mileage statistics"""
+    # Named aggregation: one pass over the groups, flat column names, no MultiIndex.
+    # Shared by the comparison chart and the detailed brand table.
+    aggregations = {'count': ('brand', 'size')}
+    if 'price_ntd' in df.columns:
+        aggregations['price_count'] = ('price_ntd', 'count')
+        aggregations['avg_price'] = ('price_ntd', 'mean')
+        aggregations['median_price'] = ('price_ntd', 'median')
+        aggregations['price_std'] = ('price_ntd', 'std')
+    if 'year' in df.columns:
+        aggregations['avg_year'] = ('year', 'mean')
+    if 'mileage_km' in df.columns:
+        aggregations['avg_mileage'] = ('mileage_km', 'mean')
+    
+    return df.groupby('brand', observed=True).agg(**aggregations).reset_index()
+
+def _agg_column_stats(df: pd.DataFrame, col: str) -> Dict:
+    """Min, max, mean and median of a numeric column from one agg call"""
+    return df[col].agg(['min', 'max', 'mean', 'median']).to_dict()
+
+def _agg_value_counts(df: pd.DataFrame, col: str) -> pd.Series:
+    """Counts of every value of col, most frequent first"""
+    return _value_counts(df[col])
+
+def _agg_mean_by(df: pd.DataFrame, by: str, value_col: str) -> pd.Series:
+    """Mean of value_col per value of by"""
+    return df.groupby(by, observed=True)[value_col].mean()
+
+def _agg_yearly_stats(df: pd.DataFrame) -> pd.DataFrame:
+    """Per-year listing count, price mean / median and mean mileage for the 10 most recent years"""
+    # Only the last 10 years are shown, so filter before grouping
+    recent_years = df['year'].drop_duplicates().nlargest(10)
+    df = df[df['year'].isin(recent_years)]
+    yearly_stats = df.groupby('year', observed=True).agg({
+        'price_ntd': ['count', 'mean', 'median'],
+        'mileage_km': 'mean' if 'mileage_km' in df.columns else 'count'
+    }).round(0)
+    yearly_stats.columns = ['車輛數', '平均價格', '中位數價格', '平均里程'] if 'mileage_km' in df.columns else ['車輛數', '平均價格', '中位數價格']
+    return yearly_stats
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _cached_derived(_df: pd.DataFrame, _func, cache_key: tuple):
+    """Cached full-length result (export, search index); few entries since each is as large as the data"""
+    return _func(_df)
+
+def _search_index(df: pd.DataFrame) -> pa.Array:
+    """Lowercased searchable text per row, one line per column so terms never span columns"""
+    columns = [col for col in SEARCH_COLS if col in df.columns]
+    if not columns:
+        return pa.array([''] * len(df), type=pa.large_string())
+    text = [pa.array(df[col].astype('string[pyarrow]')).cast(pa.large_string()) for col in columns]
+    separator = pa.scalar('\n', type=pa.large_string())
+    joined = pc.binary_join_element_wise(*text, separator, null_handling='replace', null_replacement='')
+    return pc.utf8_lower(joined)
+
+def _export_csv(df: pd.DataFrame) -> bytes:
+    """UTF-8 CSV with a BOM so Excel detects the encoding"""
+    buffer = io.BytesIO()
+    buffer.write(codecs.BOM_UTF8)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pacsv.write_csv(table, buffer, write_options=pacsv.WriteOptions(quoting_style='needed'))
+    return buffer.getvalue()
+
+def _export_json(df: pd.DataFrame) -> str:
+    """Records-oriented JSON of the frame"""
+    return df.to_json(orient='records', force_ascii=False, indent=2)
+
+def _agg_missing_counts(df: pd.DataFrame) -> pd.Series:
+    """Missing values per column, counted column by column to avoid a full boolean frame"""
+    return pd.Series({col: int(df[col].isna().sum()) for col in df.columns}, index=df.columns, dtype='int64')
+
+def _agg_top_counts(df: pd.DataFrame, col: str, k: int) -> pd.Series:
+    """The k most frequent values of col"""
+    return _value_counts(df[col]).head(k)
+
+def _agg_histogram(df: pd.DataFrame, col: str, bins: int) -> tuple:
+    """Bin counts and edges of the non-null values of col"""
+    values = df[col].dropna().to_numpy(dtype=float)
+    if len(values) == 0:
+        return np.array([], dtype=np.int64), np.array([], dtype=float)
+    return np.histogram(values, bins=bins)
+
+def _agg_scatter_sample(df: pd.DataFrame, max_points: int) -> pd.DataFrame:
+    """Reproducible sample of at most ~max_points rows, stratified by brand"""
+    n = len(df)
+    if n <= max_points:
+        return df
+    if 'brand' not in df.columns:
+        return df.sample(n=max_points, random_state=0).sort_index()
+    
+    # Shuffle once, then keep each brand's first share of rows (at least one per brand)
+    shuffled = df.sample(frac=1, random_state=0)
+    groups = shuffled.groupby('brand', observed=True, dropna=False)
+    quota = (groups['brand'].transform('size') * max_points // n).clip(lower=1)
+    return shuffled[groups.cumcount() < quota].sort_index()
+
+def _agg_drill_down(df: pd.DataFrame, x_col: str, y_col: str) -> pd.Series:
+    """Top 20 x_col values by count, or by mean y_col"""
+    counts = _value_counts(df[x_col])
+    if y_col == 'count':
+        return counts.head(20)
+    # Only group the 200 most common values; high-cardinality columns (series, model) have a long tail
+    top_keys = counts.head(200).index
+    subset = df[df[x_col].isin(top_keys)]
+    return subset.groupby(x_col, observed=True)[y_col].mean().nlargest(20)
+
+def _agg_multi_level(df: pd.DataFrame, levels: List[str], value_col: str) -> pd.DataFrame:
+    """Count / mean of value_col per combination of levels"""
+    # Project to the needed columns, then drop rows with missing values in any level
+    columns = levels + [value_col] if value_col in df.columns and value_col not in levels else levels
+    clean_df = df.loc[:, columns].dropna(subset=levels)
+    
+    # Convert year to string for better grouping (if it's in the levels)
+    if 'year' in levels:
+        clean_df = clean_df.assign(year=clean_df['year'].astype(str))
+    
+    if clean_df.empty:
+        return pd.DataFrame()
+    
+    # Create hierarchical data
+    if value_col in clean_df.columns:
+        grouped = clean_df.groupby(levels, observed=True).agg({
+            value_col: ['count', 'mean']
+        }).round(0)
+        grouped.columns = ['count', 'avg_value']
+    else:
+        grouped = clean_df.groupby(levels, observed=True).size().to_frame('count')
+        grouped['avg_value'] = 0
+    
+    grouped = grouped.reset_index()
+    # Handle special formatting for year if it's the first level
+    if 'year' in levels:
+        year_col_name = 'year'
+        if year_col_name in grouped.columns:
+            # Sort by year if it's one of the grouping levels
+            grouped = grouped.sort_values(year_col_name)
+    return grouped
+
+def _agg_correlation(df: pd.DataFrame, cols: List[str]) -> pd.DataFrame:
+    """Correlation matrix of the numeric columns"""
+    values = df[cols].to_numpy(dtype=np.float64, na_value=np.nan)
+    if np.isnan(values).any():
+        # pandas drops missing values pairwise, which np.corrcoef cannot do
+        return df[cols].corr()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = np.corrcoef(values, rowvar=False)
+    return pd.DataFrame(corr, index=cols, columns=cols)
 
 class CarDataAnalyzer:
     """Analyze car data and create visualizations"""
     
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: pd.DataFrame, cache_key: Optional[tuple] = None):
         self.df = df
+        # Identifies df (data source + active filters) so aggregations can be cached across reruns
+        self.cache_key = cache_key
+    
+    def _aggregate(self, func, *args):
+        """Run an aggregation helper, cached when the analyzer has a cache key"""
+        if self.cache_key is None:
+            return func(self.df, *args)
+        return _cached_aggregate(self.df, func, (self.cache_key, func.__name__), *args)
+    
+    def prefetch(self, open_tab: int = 0):
+        """Start computing the open tab's aggregations concurrently, without waiting for them"""
+        if self.cache_key is None or self.df.empty:
+            return
+        
+        columns = frozenset(self.df.columns)
+        has_price = 'price_ntd' in columns
+        # The data quality section below the tabs always renders
+        tasks = [(_agg_missing_counts,)]
+        if open_tab == 0:
+            tasks.append((_agg_correlation, _available_columns(columns)['numeric']))
+            if has_price and 'brand' in columns:
+                tasks.append((_agg_mean_by, 'brand', 'price_ntd'))
+            if 'region' in columns:
+                tasks.append((_agg_value_counts, 'region'))
+            if 'views_total' in columns:
+                tasks.append((_agg_column_stats, 'views_total'))
+        elif open_tab == 1 and 'brand' in columns:
+            tasks.append((_agg_treemap, 'brand', 'price_ntd'))
+        elif open_tab == 2 and has_price:
+            tasks += [(_agg_histogram, 'price_ntd', 50), (_agg_column_stats, 'price_ntd')]
+        elif open_tab == 3 and has_price and 'year' in columns:
+            tasks += [(_agg_scatter_sample, SCATTER_MAX_POINTS), (_agg_yearly_stats,)]
+        elif open_tab == 4 and 'brand' in columns:
+            tasks.append((_agg_brand_comparison,))
+        elif open_tab == 5 and 'region' in columns:
+            tasks += [(_agg_top_counts, 'region', 15), (_agg_value_counts, 'region')]
+            if has_price:
+                tasks.append((_agg_mean_by, 'region', 'price_ntd'))
+        
+        # Fire and forget: the tab's own calls share st.cache_data's per-key lock,
+        # so each waits only for its own result while the others run alongside.
+        # This session's warm-ups still queued for an older filter state are dropped.
+        # Errors are left in the futures; the later regular call raises them.
+        for future in st.session_state.get('prefetch_futures', []):
+            future.cancel()
+        ctx = get_script_run_ctx()
+        executor = _prefetch_executor()
+        st.session_state.prefetch_futures = [
+            executor.submit(_run_with_script_ctx, ctx, self._aggregate, *task)
+            for task in tasks
+        ]
     
     def get_summary_stats(self) -> Dict:
         """Get summary statistics"""
         if self.df.empty:
             return {}
         
-        return {
-            'total_cars': len(self.df),
-            'avg_price': self.df['price_ntd'].mean() if 'price_ntd' in self.df.columns else 0,
-            'avg_year': self.df['year'].mean() if 'year' in self.df.columns else 0,
-            'avg_mileage': self.df['mileage_km'].mean() if 'mileage_km' in self.df.columns else 0,
-            'brands_count': self.df['brand'].nunique() if 'brand' in self.df.columns else 0,
-            'regions_count': self.df['region'].nunique() if 'region' in self.df.columns else 0
+        return self._aggregate(_agg_summary_stats)
+    
+    def get_column_stats(self, col: str) -> Dict:
+        """Get min / max / mean / median of a numeric column"""
+        return self._aggregate(_agg_column_stats, col)
+    
+    def get_value_counts(self, col: str) -> pd.Series:
+        """Get value counts of a column, most frequent first"""
+        return self._aggregate(_agg_value_counts, col)
+    
+    def get_mean_by(self, by: str, value_col: str) -> pd.Series:
+        """Get the mean of value_col per value of by"""
+        return self._aggregate(_agg_mean_by, by, value_col)
+    
+    def get_missing_counts(self) -> pd.Series:
+        """Get the number of missing values per column"""
+        return self._aggregate(_agg_missing_counts)
+    
+    def get_yearly_stats(self) -> pd.DataFrame:
+        """Get per-year price and mileage statistics"""
+        return self._aggregate(_agg_yearly_stats)
+    
+    def get_brand_details(self) -> pd.DataFrame:
+        """Get per-brand detailed statistics, largest brands first"""
+        brand_stats = self._aggregate(_agg_brand_comparison).set_index('brand')
+        columns = {
+            'price_count' if 'price_count' in brand_stats.columns else 'count': '車輛數',
+            'avg_price': '平均價格',
+            'median_price': '中位數價格',
+            'price_std': '價格標準差',
+            'avg_year': '平均年份',
+            'avg_mileage': '平均里程'
         }
+        brand_analysis = brand_stats[[col for col in columns if col in brand_stats.columns]].rename(columns=columns)
+        return brand_analysis.round(2).sort_values('車輛數', ascending=False)
+    
+    def _derive(self, func):
+        """Run a full-length helper, cached like _aggregate but in a smaller cache"""
+        if self.cache_key is None:
+            return func(self.df)
+        return _cached_derived(self.df, func, (self.cache_key, func.__name__))
+    
+    def export_csv(self) -> bytes:
+        """Serialize the current data to CSV bytes"""
+        return self._derive(_export_csv)
+    
+    def export_json(self) -> str:
+        """Serialize the current data to JSON"""
+        return self._derive(_export_json)
+    
+    def search(self, term: str) -> np.ndarray:
+        """Get a mask of rows whose title, brand, model or series contain term, ignoring case"""
+        matches = pc.match_substring(self._derive(_search_index), pattern=term.lower())
+        return matches.to_numpy(zero_copy_only=False)
     
     def create_interactive_treemap(self, group_by: str = 'brand', value_col: str = 'price_ntd') -> go.Figure:
         """Create interactive treemap with drill-down capability"""
@@ -263,17 +789,9 @@ class CarDataAnalyzer:
             return go.Figure()
         
         # Aggregate data
-        if value_col in self.df.columns:
-            grouped = self.df.groupby(group_by).agg({
-                value_col: ['count', 'mean', 'sum']
-            }).round(0)
-            grouped.columns = ['count', 'avg_value', 'total_value']
-        else:
-            grouped = self.df.groupby(group_by).size().to_frame('count')
-            grouped['avg_value'] = 0
-            grouped['total_value'] = grouped['count']
+        grouped = self._aggregate(_agg_treemap, group_by, value_col)
         
-        grouped = grouped.reset_index()        # Create treemap
+        # Create treemap
         fig = px.treemap(
             grouped, 
             path=[group_by], 
@@ -287,7 +805,7 @@ class CarDataAnalyzer:
         # Add custom data for proper price display (divide by 10,000 for 萬 units)
         avg_price_in_wan = grouped['avg_value'] / 10000
         fig.update_traces(
-            customdata=avg_price_in_wan.values.reshape(-1, 1),
+            customdata=avg_price_in_wan.to_numpy(dtype=float, na_value=np.nan).reshape(-1, 1),
             hovertemplate='<b>%{label}</b><br>' +
                          '數量: %{value}<br>' +
                          '平均價格: %{customdata[0]:,.1f}萬<br>' +
@@ -313,17 +831,24 @@ class CarDataAnalyzer:
         if self.df.empty or 'price_ntd' not in self.df.columns:
             return go.Figure()
         
-        fig = px.histogram(
-            self.df, 
-            x='price_ntd', 
-            nbins=50,
-            title='價格分布圖',
-            labels={'price_ntd': '價格 (新台幣)', 'count': '車輛數量'}
-        )
+        # Bin on the server so the figure carries 50 bars instead of every price
+        counts, edges = self._aggregate(_agg_histogram, 'price_ntd', 50)
+        if len(counts) == 0:
+            return go.Figure()
+        
+        fig = go.Figure(go.Bar(
+            x=(edges[:-1] + edges[1:]) / 2,
+            y=counts,
+            width=np.diff(edges),
+            customdata=np.column_stack([edges[:-1], edges[1:]]),
+            hovertemplate='%{customdata[0]:,.0f} - %{customdata[1]:,.0f}<br>車輛數量: %{y:,}<extra></extra>'
+        ))
         
         fig.update_layout(
+            title='價格分布圖',
             xaxis_title='價格 (新台幣)',
-            yaxis_title='車輛數量'
+            yaxis_title='車輛數量',
+            bargap=0
         )
         
         return fig
@@ -333,14 +858,20 @@ class CarDataAnalyzer:
         if self.df.empty or 'year' not in self.df.columns or 'price_ntd' not in self.df.columns:
             return go.Figure()
         
+        sample = self._aggregate(_agg_scatter_sample, SCATTER_MAX_POINTS)
+        title = '年份 vs 價格散點圖'
+        if len(sample) < len(self.df):
+            title += f' (依品牌抽樣 {len(sample):,} / {len(self.df):,} 筆)'
+        
         fig = px.scatter(
-            self.df, 
+            sample, 
             x='year', 
             y='price_ntd',
             color='brand' if 'brand' in self.df.columns else None,
             size='mileage_km' if 'mileage_km' in self.df.columns else None,
             hover_data=['model', 'region'] if all(col in self.df.columns for col in ['model', 'region']) else None,
-            title='年份 vs 價格散點圖'
+            title=title,
+            render_mode='webgl'
         )
         
         fig.update_layout(
@@ -355,14 +886,7 @@ class CarDataAnalyzer:
         if self.df.empty or 'brand' not in self.df.columns:
             return go.Figure()
         
-        brand_stats = self.df.groupby('brand').agg({
-            'price_ntd': ['count', 'mean', 'median'] if 'price_ntd' in self.df.columns else ['count'],
-            'year': 'mean' if 'year' in self.df.columns else 'count',
-            'mileage_km': 'mean' if 'mileage_km' in self.df.columns else 'count'
-        }).round(0)
-        
-        brand_stats.columns = ['count', 'avg_price', 'median_price', 'avg_year', 'avg_mileage'] if 'price_ntd' in self.df.columns else ['count', 'avg_year', 'avg_mileage']
-        brand_stats = brand_stats.reset_index()
+        brand_stats = self._aggregate(_agg_brand_comparison)
         
         # Create subplots
         fig = make_subplots(
@@ -396,6 +920,8 @@ class CarDataAnalyzer:
                 row=2, col=2
             )
         
+        # Values are not pre-rounded; round for display only
+        fig.update_traces(hovertemplate='<b>%{x}</b><br>%{y:,.0f}<extra></extra>')
         fig.update_layout(height=600, title_text="品牌比較分析", showlegend=False)
         
         return fig
@@ -405,7 +931,7 @@ class CarDataAnalyzer:
         if self.df.empty or 'region' not in self.df.columns:
             return go.Figure()
         
-        region_stats = self.df['region'].value_counts().head(15)
+        region_stats = self._aggregate(_agg_top_counts, 'region', 15)
         fig = px.bar(
             x=region_stats.index,
             y=region_stats.values,
@@ -426,8 +952,8 @@ class CarDataAnalyzer:
         if self.df.empty or x_col not in self.df.columns:
             return go.Figure()
         
+        grouped = self._aggregate(_agg_drill_down, x_col, y_col)
         if y_col == 'count':
-            grouped = self.df[x_col].value_counts().head(20)
             fig = px.bar(
                 x=grouped.index,
                 y=grouped.values,
@@ -435,7 +961,6 @@ class CarDataAnalyzer:
                 labels={'x': x_col, 'y': '車輛數量'}
             )
         else:
-            grouped = self.df.groupby(x_col)[y_col].mean().sort_values(ascending=False).head(20)
             fig = px.bar(
                 x=grouped.index,
                 y=grouped.values,
@@ -478,37 +1003,10 @@ class CarDataAnalyzer:
         if self.df.empty or not all(col in self.df.columns for col in levels):
             return go.Figure()
         
-        # Create a copy for processing
-        clean_df = self.df.copy()
-        
-        # Convert year to string for better grouping (if it's in the levels)
-        if 'year' in levels and 'year' in clean_df.columns:
-            clean_df['year'] = clean_df['year'].astype(str)
-        
-        # Filter out rows with missing values in any level
-        clean_df = clean_df.dropna(subset=levels)
-        
-        if clean_df.empty:
+        grouped = self._aggregate(_agg_multi_level, list(levels), value_col)
+        if grouped.empty:
             return go.Figure()
         
-        # Create hierarchical data
-        if value_col in clean_df.columns:
-            grouped = clean_df.groupby(levels).agg({
-                value_col: ['count', 'mean']
-            }).round(0)
-            grouped.columns = ['count', 'avg_value']
-        else:
-            grouped = clean_df.groupby(levels).size().to_frame('count')
-            grouped['avg_value'] = 0
-        
-        grouped = grouped.reset_index()
-          # Handle special formatting for year if it's the first level
-        if 'year' in levels:
-            year_col_name = 'year'
-            if year_col_name in grouped.columns:
-                # Sort by year if it's one of the grouping levels
-                grouped = grouped.sort_values(year_col_name)
-        
         fig = px.treemap(
             grouped,
             path=levels,
@@ -522,7 +1020,7 @@ class CarDataAnalyzer:
         # Add custom data for proper price display (divide by 10,000 for 萬 units)
         avg_price_in_wan = grouped['avg_value'] / 10000
         fig.update_traces(
-            customdata=avg_price_in_wan.values.reshape(-1, 1),
+            customdata=avg_price_in_wan.to_numpy(dtype=float, na_value=np.nan).reshape(-1, 1),
             hovertemplate='<b>%{label}</b><br>' +
                          '數量: %{value}<br>' +
                          '平均價格: %{customdata[0]:,.1f}萬<br>' +
@@ -533,13 +1031,12 @@ class CarDataAnalyzer:
     
     def create_correlation_heatmap(self) -> go.Figure:
         """Create correlation heatmap for numerical columns"""
-        numeric_cols = ['year', 'mileage_km', 'price_ntd', 'views_today', 'views_total']
-        available_cols = [col for col in numeric_cols if col in self.df.columns]
+        available_cols = _available_columns(frozenset(self.df.columns))['numeric']
         
         if len(available_cols) < 2:
             return go.Figure()
         
-        corr_matrix = self.df[available_cols].corr()
+        corr_matrix = self._aggregate(_agg_correlation, available_cols)
         
         fig = px.imshow(
             corr_matrix,
@@ -553,24 +1050,7 @@ class CarDataAnalyzer:
     
     def get_drill_down_options(self) -> Dict[str, List[str]]:
         """Get available drill-down options based on current data"""
-        options = {
-            '品牌分析': ['brand', 'series', 'model'],
-            '地區分析': ['region'],
-            '年份分析': ['year'],
-            '價格分析': ['price_ntd'],
-            '燃料類型': ['fuel'],
-            '變速箱': ['transmission'],
-            '顏色': ['color']
-        }
-        
-        # Filter options based on available columns
-        available_options = {}
-        for category, columns in options.items():
-            available_columns = [col for col in columns if col in self.df.columns]
-            if available_columns:
-                available_options[category] = available_columns
-        
-        return available_options
+        return _drill_down_options(frozenset(self.df.columns))
 def main():
     """Main dashboard function"""
     st.markdown('<h1 class="main-header">🚗 8891 汽車數據分析儀表板</h1>', unsafe_allow_html=True)
@@ -588,37 +1068,35 @@ def main():
         ["CSV 檔案", "原始 JSON 檔案", "兩者合併"]
     )
     
-    # Load data
+    # Load data once per source and file state; reruns reuse the frame kept in session state
     loader = CarDataLoader()
+    data_key = (data_source, loader.csv_signature, loader.json_signature)
     
-    if data_source == "CSV 檔案":
-        df = loader.load_csv_data()
-    elif data_source == "原始 JSON 檔案":
-        df = loader.load_raw_json_data()
-    else:  # 兩者合併
-        csv_df = loader.load_csv_data()
-        json_df = loader.load_raw_json_data()
-        if not csv_df.empty and not json_df.empty:
-            df = pd.concat([csv_df, json_df], ignore_index=True)
-            # Remove duplicates
-            if 'item_id' in df.columns:
-                df = df.drop_duplicates(subset=['item_id'], keep='first')
-        elif not csv_df.empty:
-            df = csv_df
-        elif not json_df.empty:
-            df = json_df
-        else:
-            df = pd.DataFrame()
+    if st.session_state.get('df_raw_key') != data_key:
+        if data_source == "CSV 檔案":
+            st.session_state.df_raw = loader.load_csv_data()
+        elif data_source == "原始 JSON 檔案":
+            st.session_state.df_raw = loader.load_raw_json_data()
+        else:  # 兩者合併
+            st.session_state.df_raw = loader.load_merged_data()
+        st.session_state.df_raw_key = data_key
+    df = st.session_state.df_raw
     
     if df.empty:
         st.error("❌ 找不到數據檔案！請確認 ./data 目錄中有 CSV 檔案或 raw/*/jsonl 檔案。")
         st.info("💡 請先運行 fetch_8891_csv.py 來獲取數據")
         return
     
+    # Filtering never changes the columns, so resolve the column checks once
+    df_columns = frozenset(df.columns)
+    available_columns = _available_columns(df_columns)
+    
     # Apply drill-down filters
-    original_df = df.copy()
     df = DrillDownManager.apply_filters(df)
     
+    # Everything that determines the filtered frame, used to cache aggregations across reruns
+    filter_key = (data_key, tuple(st.session_state.drill_down_filters.items()))
+    
     # Show current filter info
     if st.session_state.drill_down_filters:
         st.sidebar.subheader("🎯 當前鑽取篩選")
@@ -628,7 +1106,7 @@ def main():
         st.sidebar.markdown("---")
     
     # Initialize analyzer
-    analyzer = CarDataAnalyzer(df)
+    analyzer = CarDataAnalyzer(df, cache_key=filter_key)
     
     # Display summary stats
     st.subheader("📈 總覽統計")
@@ -677,13 +1155,13 @@ def main():
                 st.plotly_chart(fig_bar, use_container_width=True, key=f"drill_bar_{selected_column}")
                 
                 # Enhanced manual drill-down interface
-                if selected_column in df.columns:
+                if selected_column in df_columns:
                     available_values = sorted(df[selected_column].dropna().unique())
                     if available_values:
                         st.markdown("### 🎯 選擇進行鑽取分析")
                         
                         # Show top values with counts for easier selection
-                        value_counts = df[selected_column].value_counts().head(15)
+                        value_counts = analyzer.get_value_counts(selected_column).head(15)
                         
                         col_a, col_b = st.columns([2, 1])
                         with col_a:
@@ -727,198 +1205,211 @@ def main():
             
             **可用維度:**
             """)
-            for category, columns in drill_options.items():
-                available_cols = [col for col in columns if col in df.columns]
-                if available_cols:
-                    st.markdown(f"- **{category}**: {', '.join(available_cols)}")
+            for category, available_cols in drill_options.items():
+                st.markdown(f"- **{category}**: {', '.join(available_cols)}")
     
     # Enhanced filters section
     st.sidebar.subheader("🔍 進階篩選器")
     
+    # The filters narrow one shared mask and the frame is sliced once at the end;
+    # each slider's bounds come from the rows the previous filters kept
+    mask = np.ones(len(df), dtype=bool)
+    
     # Brand filter
-    if 'brand' in df.columns:
+    if 'brand' in df_columns:
         brands = ['全部'] + sorted(df['brand'].dropna().unique().tolist())
         selected_brand = st.sidebar.selectbox("品牌", brands, key="brand_filter")
         if selected_brand != '全部':
-            df = df[df['brand'] == selected_brand]
+            mask &= (df['brand'] == selected_brand).to_numpy(dtype=bool, na_value=False)
+        filter_key += (('brand', selected_brand),)
     
     # Year filter
-    if 'year' in df.columns and not df['year'].isna().all():
+    years = df['year'][mask] if 'year' in df_columns else None
+    if years is not None and not years.isna().all():
         year_range = st.sidebar.slider(
             "年份範圍",
-            min_value=int(df['year'].min()),
-            max_value=int(df['year'].max()),
-            value=(int(df['year'].min()), int(df['year'].max())),
+            min_value=int(years.min()),
+            max_value=int(years.max()),
+            value=(int(years.min()), int(years.max())),
             key="year_filter"
         )
-        df = df[(df['year'] >= year_range[0]) & (df['year'] <= year_range[1])]
+        mask &= df['year'].between(*year_range).to_numpy(dtype=bool, na_value=False)
+        filter_key += (('year', year_range),)
     
     # Price filter
-    if 'price_ntd' in df.columns and not df['price_ntd'].isna().all():
+    prices = df['price_ntd'][mask] if 'price_ntd' in df_columns else None
+    if prices is not None and not prices.isna().all():
         price_range = st.sidebar.slider(
             "價格範圍 (萬)",
             min_value=0,
-            max_value=int(df['price_ntd'].max()),
-            value=(0, int(df['price_ntd'].max())),
+            max_value=int(prices.max()),
+            value=(0, int(prices.max())),
             key="price_filter"
         )
-        df = df[(df['price_ntd'] >= price_range[0]) & (df['price_ntd'] <= price_range[1])]
+        mask &= df['price_ntd'].between(*price_range).to_numpy(dtype=bool, na_value=False)
+        filter_key += (('price', price_range),)
+    
+    if not mask.all():
+        df = df.loc[mask]
     
-    # Update analyzer with filtered data
-    analyzer = CarDataAnalyzer(df)
+    # Update analyzer with filtered data and start the open tab's aggregations in parallel
+    analyzer = CarDataAnalyzer(df, cache_key=filter_key)
+    open_tab = st.session_state.get('main_tab')
+    analyzer.prefetch(MAIN_TABS.index(open_tab) if open_tab in MAIN_TABS else 0)
       # Main content
-    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["🔍 互動鑽取", "🌳 樹狀圖", "📊 價格分析", "🔍 年份價格", "🏢 品牌比較", "📍 地區分析"])
+    # Stateful tabs: only the selected tab's body runs on each rerun
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(
+        MAIN_TABS,
+        key="main_tab",
+        on_change="rerun"
+    )
     
-    with tab1:
-        st.subheader("🔍 互動式多層級鑽取分析")
+    if tab1.open:
+        with tab1:
+            st.subheader("🔍 互動式多層級鑽取分析")
         
-        # Multi-level treemap
-        st.markdown("### 📊 多層級樹狀圖")
+            # Multi-level treemap
+            st.markdown("### 📊 多層級樹狀圖")
         
-        col1, col2 = st.columns([3, 1])
+            col1, col2 = st.columns([3, 1])
         
-        with col2:            # Select hierarchy levels
-            available_levels = ['brand', 'series', 'model', 'region', 'fuel', 'transmission', 'color', 'year']
-            available_levels = [level for level in available_levels if level in df.columns]
+            with col2:            # Select hierarchy levels
+                available_levels = available_columns['levels']
             
-            if len(available_levels) >= 2:
-                selected_levels = st.multiselect(
-                    "選擇層級 (按順序):",
-                    available_levels,
-                    default=available_levels[:2],
-                    max_selections=3,
-                    key="hierarchy_levels"
-                )
+                if len(available_levels) >= 2:
+                    selected_levels = st.multiselect(
+                        "選擇層級 (按順序):",
+                        available_levels,
+                        default=available_levels[:2],
+                        max_selections=3,
+                        key="hierarchy_levels"
+                    )
                 
-                if selected_levels:
-                    with col1:
-                        fig_multi = analyzer.create_multi_level_treemap(selected_levels)
-                        st.plotly_chart(fig_multi, use_container_width=True)
+                    if selected_levels:
+                        with col1:
+                            fig_multi = analyzer.create_multi_level_treemap(selected_levels)
+                            st.plotly_chart(fig_multi, use_container_width=True)
+                else:
+                    st.warning("需要至少2個可用的分類欄位來建立多層級分析")
+        
+            # Correlation analysis
+            st.markdown("### 🌡️ 數值欄位相關性分析")
+            fig_corr = analyzer.create_correlation_heatmap()
+            if fig_corr.data:
+                st.plotly_chart(fig_corr, use_container_width=True)
             else:
-                st.warning("需要至少2個可用的分類欄位來建立多層級分析")
-        
-        # Correlation analysis
-        st.markdown("### 🌡️ 數值欄位相關性分析")
-        fig_corr = analyzer.create_correlation_heatmap()
-        if fig_corr.data:
-            st.plotly_chart(fig_corr, use_container_width=True)
-        else:
-            st.info("需要至少2個數值欄位來顯示相關性分析")
-        
-        # Dynamic insights
-        st.markdown("### 💡 動態洞察")
-        insights_col1, insights_col2 = st.columns(2)
-        
-        with insights_col1:
-            if 'brand' in df.columns and 'price_ntd' in df.columns:
-                top_brand = df.groupby('brand')['price_ntd'].mean().sort_values(ascending=False).iloc[0]
-                top_brand_name = df.groupby('brand')['price_ntd'].mean().sort_values(ascending=False).index[0]
-                st.metric("最高平均價格品牌", f"{top_brand_name}", f"{top_brand/10000:,.1f} 萬")
+                st.info("需要至少2個數值欄位來顯示相關性分析")
+        
+            # Dynamic insights
+            st.markdown("### 💡 動態洞察")
+            insights_col1, insights_col2 = st.columns(2)
+        
+            with insights_col1:
+                if 'brand' in df_columns and 'price_ntd' in df_columns:
+                    brand_mean = analyzer.get_mean_by('brand', 'price_ntd')
+                    top_brand_name = brand_mean.idxmax()
+                    top_brand = brand_mean.max()
+                    st.metric("最高平均價格品牌", f"{top_brand_name}", f"{top_brand/10000:,.1f} 萬")
             
-            if 'year' in df.columns:
-                newest_year = df['year'].max()
-                newest_count = len(df[df['year'] == newest_year])
-                st.metric(f"{newest_year}年車款數量", f"{newest_count:,}")
-        
-        with insights_col2:
-            if 'region' in df.columns:
-                top_region = df['region'].value_counts().iloc[0]
-                top_region_name = df['region'].value_counts().index[0]
-                st.metric("車輛最多地區", f"{top_region_name}", f"{top_region:,} 輛")
+                if 'year' in df_columns:
+                    newest_year = df['year'].max()
+                    newest_count = int((df['year'] == newest_year).sum())
+                    st.metric(f"{newest_year}年車款數量", f"{newest_count:,}")
+        
+            with insights_col2:
+                if 'region' in df_columns:
+                    region_counts = analyzer.get_value_counts('region')
+                    top_region = region_counts.iat[0]
+                    top_region_name = region_counts.index[0]
+                    st.metric("車輛最多地區", f"{top_region_name}", f"{top_region:,} 輛")
             
-            if 'views_total' in df.columns:
-                avg_views = df['views_total'].mean()
-                st.metric("平均總瀏覽數", f"{avg_views:,.0f}")
-    
-    with tab2:
-        st.subheader("樹狀圖分析")
-        treemap_option = st.selectbox(
-            "選擇分組方式:",
-            ["brand", "series", "region", "fuel", "transmission"],
-            key="treemap_groupby"
-        )
+                if 'views_total' in df_columns:
+                    avg_views = analyzer.get_column_stats('views_total')['mean']
+                    st.metric("平均總瀏覽數", f"{avg_views:,.0f}")
+    
+    if tab2.open:
+        with tab2:
+            st.subheader("樹狀圖分析")
+            treemap_option = st.selectbox(
+                "選擇分組方式:",
+                ["brand", "series", "region", "fuel", "transmission"],
+                key="treemap_groupby"
+            )
         
-        if treemap_option in df.columns:
-            fig = analyzer.create_interactive_treemap(treemap_option)
-            st.plotly_chart(fig, use_container_width=True)
+            if treemap_option in df_columns:
+                fig = analyzer.create_interactive_treemap(treemap_option)
+                st.plotly_chart(fig, use_container_width=True)
             
-            # Show top categories
-            st.markdown(f"### 📋 {treemap_option} 前10名")
-            top_categories = df[treemap_option].value_counts().head(10)
-            st.dataframe(top_categories.reset_index().rename(columns={'index': treemap_option, treemap_option: '數量'}))
-        else:
-            st.warning(f"數據中沒有 {treemap_option} 欄位")    
-    with tab3:
-        st.subheader("價格分布分析")
-        fig = analyzer.create_price_distribution()
-        st.plotly_chart(fig, use_container_width=True)
-          # Price statistics
-        if 'price_ntd' in df.columns:
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("最低價格", f"{df['price_ntd'].min()/10000:,.1f} 萬")
-            with col2:
-                st.metric("最高價格", f"{df['price_ntd'].max()/10000:,.1f} 萬")
-            with col3:
-                st.metric("中位數價格", f"{df['price_ntd'].median()/10000:,.1f} 萬")
-    
-    with tab4:
-        st.subheader("年份 vs 價格分析")
-        fig = analyzer.create_year_price_scatter()
-        st.plotly_chart(fig, use_container_width=True)
-        
-        # Add year-based insights
-        if 'year' in df.columns and 'price_ntd' in df.columns:
-            st.markdown("### 📊 按年份統計")
-            yearly_stats = df.groupby('year').agg({
-                'price_ntd': ['count', 'mean', 'median'],
-                'mileage_km': 'mean' if 'mileage_km' in df.columns else 'count'
-            }).round(0)
-            yearly_stats.columns = ['車輛數', '平均價格', '中位數價格', '平均里程'] if 'mileage_km' in df.columns else ['車輛數', '平均價格', '中位數價格']
-            st.dataframe(yearly_stats.tail(10))  # Show last 10 years
-    
-    with tab5:
-        st.subheader("品牌比較分析")
-        fig = analyzer.create_brand_comparison()
-        st.plotly_chart(fig, use_container_width=True)
-        
-        # Brand detailed analysis
-        if 'brand' in df.columns:
-            st.markdown("### 📊 品牌詳細統計")
-            brand_analysis = df.groupby('brand').agg({
-                'price_ntd': ['count', 'mean', 'median', 'std'] if 'price_ntd' in df.columns else ['count'],
-                'year': 'mean' if 'year' in df.columns else 'count',
-                'mileage_km': 'mean' if 'mileage_km' in df.columns else 'count'
-            }).round(2)
-            
-            # Flatten column names
-            brand_analysis.columns = ['車輛數', '平均價格', '中位數價格', '價格標準差', '平均年份', '平均里程'] if 'price_ntd' in df.columns else ['車輛數', '平均年份', '平均里程']
-            brand_analysis = brand_analysis.sort_values('車輛數', ascending=False)
-            st.dataframe(brand_analysis)
-    
-    with tab6:
-        st.subheader("地區分布分析")
-        fig = analyzer.create_region_analysis()
-        st.plotly_chart(fig, use_container_width=True)
-        
-        # Regional insights
-        if 'region' in df.columns:
-            st.markdown("### 🌍 地區詳細分析")
+                # Show top categories
+                st.markdown(f"### 📋 {treemap_option} 前10名")
+                top_categories = analyzer.get_value_counts(treemap_option).head(10)
+                st.dataframe(top_categories.reset_index().rename(columns={'index': treemap_option, treemap_option: '數量'}))
+            else:
+                st.warning(f"數據中沒有 {treemap_option} 欄位")    
+    if tab3.open:
+        with tab3:
+            st.subheader("價格分布分析")
+            fig = analyzer.create_price_distribution()
+            st.plotly_chart(fig, use_container_width=True)
+              # Price statistics
+            if 'price_ntd' in df_columns:
+                price_stats = analyzer.get_column_stats('price_ntd')
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("最低價格", f"{price_stats['min']/10000:,.1f} 萬")
+                with col2:
+                    st.metric("最高價格", f"{price_stats['max']/10000:,.1f} 萬")
+                with col3:
+                    st.metric("中位數價格", f"{price_stats['median']/10000:,.1f} 萬")
+    
+    if tab4.open:
+        with tab4:
+            st.subheader("年份 vs 價格分析")
+            fig = analyzer.create_year_price_scatter()
+            st.plotly_chart(fig, use_container_width=True)
+        
+            # Add year-based insights
+            if 'year' in df_columns and 'price_ntd' in df_columns:
+                st.markdown("### 📊 按年份統計")
+                yearly_stats = analyzer.get_yearly_stats()
+                st.dataframe(yearly_stats)  # Last 10 years
+    
+    if tab5.open:
+        with tab5:
+            st.subheader("品牌比較分析")
+            fig = analyzer.create_brand_comparison()
+            st.plotly_chart(fig, use_container_width=True)
+        
+            # Brand detailed analysis
+            if 'brand' in df_columns:
+                st.markdown("### 📊 品牌詳細統計")
+                brand_analysis = analyzer.get_brand_details()
+                st.dataframe(brand_analysis)
+    
+    if tab6.open:
+        with tab6:
+            st.subheader("地區分布分析")
+            fig = analyzer.create_region_analysis()
+            st.plotly_chart(fig, use_container_width=True)
+        
+            # Regional insights
+            if 'region' in df_columns:
+                st.markdown("### 🌍 地區詳細分析")
             
-            col1, col2 = st.columns(2)
+                col1, col2 = st.columns(2)
             
-            with col1:
-                st.markdown("**車輛數量排名:**")
-                region_counts = df['region'].value_counts().head(10)
-                st.dataframe(region_counts.reset_index().rename(columns={'index': '地區', 'region': '車輛數'}))
+                with col1:
+                    st.markdown("**車輛數量排名:**")
+                    region_counts = analyzer.get_value_counts('region').head(10)
+                    st.dataframe(region_counts.reset_index().rename(columns={'index': '地區', 'region': '車輛數'}))
             
-            with col2:
-                if 'price_ntd' in df.columns:
-                    st.markdown("**平均價格排名:**")
-                    region_prices = df.groupby('region')['price_ntd'].mean().sort_values(ascending=False).head(10)
-                    # Convert to 萬 units for display
-                    region_prices_wan = region_prices / 10000
-                    st.dataframe(region_prices_wan.reset_index().rename(columns={'region': '地區', 'price_ntd': '平均價格 (萬)'}))
+                with col2:
+                    if 'price_ntd' in df_columns:
+                        st.markdown("**平均價格排名:**")
+                        region_prices = analyzer.get_mean_by('region', 'price_ntd').sort_values(ascending=False).head(10)
+                        # Convert to 萬 units for display
+                        region_prices_wan = region_prices / 10000
+                        st.dataframe(region_prices_wan.reset_index().rename(columns={'region': '地區', 'price_ntd': '平均價格 (萬)'}))
     
     # Enhanced data exploration section
     st.markdown("---")
@@ -930,8 +1421,8 @@ def main():
         # Custom analysis builder
         st.markdown("### 🛠️ 自定義分析")
         
-        available_numeric = [col for col in ['year', 'mileage_km', 'price_ntd', 'views_today', 'views_total'] if col in df.columns]
-        available_categorical = [col for col in ['brand', 'series', 'model', 'region', 'fuel', 'transmission', 'color'] if col in df.columns]
+        available_numeric = available_columns['numeric']
+        available_categorical = available_columns['categorical']
         
         if available_numeric and available_categorical:
             x_axis = st.selectbox("X軸 (分類):", available_categorical, key="custom_x")
@@ -949,7 +1440,7 @@ def main():
         st.write(f"**總行數:** {total_rows:,}")
         
         # Missing values analysis
-        missing_data = df.isnull().sum()
+        missing_data = analyzer.get_missing_counts()
         missing_pct = (missing_data / total_rows * 100).round(2)
         
         quality_df = pd.DataFrame({
@@ -969,38 +1460,39 @@ def main():
         # Add search functionality
         search_term = st.text_input("🔍 搜尋 (在標題、品牌、型號中):", key="data_search")
         
-        display_df = df.copy()
+        # Count every match, but only slice out the first 100 rows that are shown
         if search_term:
-            search_columns = [col for col in ['title', 'brand', 'model', 'series'] if col in display_df.columns]
-            if search_columns:
-                mask = False
-                for col in search_columns:
-                    mask |= display_df[col].astype(str).str.contains(search_term, case=False, na=False)
-                display_df = display_df[mask]
+            mask = analyzer.search(search_term)
+            match_count = int(mask.sum())
+            display_df = df.iloc[np.flatnonzero(mask)[:100]]
+        else:
+            match_count = len(df)
+            display_df = df.iloc[:100]
         
-        st.write(f"顯示 {len(display_df):,} 筆資料")
-        st.dataframe(display_df.head(100))
+        st.write(f"顯示 {match_count:,} 筆資料")
+        st.dataframe(display_df)
     
     # Download filtered data
     st.sidebar.subheader("💾 下載數據")
     download_format = st.sidebar.radio("下載格式:", ["CSV", "JSON"], key="download_format")
     
     if st.sidebar.button("準備下載", key="prepare_download"):
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         if download_format == "CSV":
-            csv_data = df.to_csv(index=False, encoding='utf-8-sig')
+            csv_data = analyzer.export_csv()
             st.sidebar.download_button(
                 label="📥 下載 CSV",
                 data=csv_data,
-                file_name=f"filtered_car_data_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                file_name=f"filtered_car_data_{timestamp}.csv",
                 mime="text/csv",
                 key="download_csv"
             )
         else:
-            json_data = df.to_json(orient='records', force_ascii=False, indent=2)
+            json_data = analyzer.export_json()
             st.sidebar.download_button(
                 label="📥 下載 JSON",
                 data=json_data,
-                file_name=f"filtered_car_data_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.json",
+                file_name=f"filtered_car_data_{timestamp}.json",
                 mime="application/json",
                 key="download_json"
             )
@@ -12,6 +12,8 @@ Requires: Python 3.10+, requests
 
 Examples:
   python fetch_8891_csv.py --config config_8891.json --out-dir ./data --auto --max-pages 300 --sleep 1.2 --raw-jsonl
+  python fetch_8891_csv.py --config config_8891.json --out-dir ./data --auto --workers 8   # 8 brand-kind tasks at once
+  python fetch_8891_csv.py --config config_8891.json --out-dir ./data --auto --raw-gzip    # archive raw JSON as .jsonl.gz
   python fetch_8891_csv.py --config config_8891.json --out-dir ./data --pages 5   # fixed pages mode
 """
 from __future__ import annotations
@@ -19,39 +21,53 @@ from __future__ import annotations
 import argparse
 import csv
 import datetime as dt
+import gzip
 import json
 import logging
 import re
 import sys
 import time
 import urllib3
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, List, Optional
+from urllib.parse import quote
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Disable SSL warnings when verify=False is used
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 BASE_URL = "https://www.8891.com.tw/api/v5/items/search"
+RETRY_STATUS = (429, 500, 502, 503, 504)
+REQUEST_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/127.0.0.0 Safari/537.36",
+    "Accept": "application/json,text/plain,*/*",
+    "Accept-Language": "zh-TW,zh;q=0.9,en;q=0.8",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Connection": "keep-alive",
+    "Referer": "https://auto.8891.com.tw/",
+    "Sec-Fetch-Dest": "empty",
+    "Sec-Fetch-Mode": "cors",
+    "Sec-Fetch-Site": "same-site"
+}
 
 # ------------------ Chinese text support ------------------
 
+_CHINESE_SUPPORT_READY = False
+
 def setup_chinese_support():
     """Setup proper Chinese text support for Windows terminal"""
-    import sys
-    import os
+    global _CHINESE_SUPPORT_READY
+    if _CHINESE_SUPPORT_READY:
+        return
+    _CHINESE_SUPPORT_READY = True
     
-    # Set UTF-8 encoding for stdout/stderr
-    if sys.platform.startswith('win'):
-        try:
-            # Try to set console to UTF-8 mode
-            os.system('chcp 65001 > nul')
-        except:
-            pass
-    
-    # Ensure proper encoding for print statements
+    # The Windows console already takes Unicode through WindowsConsoleIO (PEP 528),
+    # so no `chcp 65001` shell is spawned; reconfiguring covers redirected output.
     if hasattr(sys.stdout, 'reconfigure'):
         try:
             sys.stdout.reconfigure(encoding='utf-8')
@@ -61,44 +77,55 @@ def setup_chinese_support():
 
 # ------------------ helpers: parse CJK fields to numbers ------------------
 
+_NUM_RE = re.compile(r'[\d.]+')
+_YEAR_RE = re.compile(r'(19|20)\d{2}')
+
+def _looks_garbled(text: str) -> bool:
+    return '\ufffd' in text or '?' in text
+
 def clean_text(text: Optional[str]) -> str:
     """Clean and normalize text to handle encoding issues, especially for Chinese characters"""
     if text is None:
         return ""
     if not isinstance(text, str):
         text = str(text)
+
+    # Fast path: without replacement characters there is nothing to repair, only
+    # null bytes to drop and whitespace (including full-width spaces) to collapse.
+    # This also covers ASCII-only fields: CPython answers '\ufffd' in text in O(1)
+    # for them, since the character is above the string's max code point.
+    if '\ufffd' not in text:
+        if '\x00' in text:
+            text = text.replace('\x00', '')
+        return ' '.join(text.split())
     
     # Handle common encoding issues for Chinese text
     try:
-        # Check if text contains garbled characters that might be double-encoded
-        if any(char in text for char in ['�', '?', '\ufffd']):
-            # Try to fix common Chinese encoding issues
+        # Try to fix common Chinese encoding issues
+        try:
+            # Method 1: Try fixing double-encoded UTF-8
+            fixed_text = text.encode('latin1').decode('utf-8', errors='ignore')
+            if fixed_text and not _looks_garbled(fixed_text):
+                text = fixed_text
+        except (UnicodeDecodeError, UnicodeEncodeError):
             try:
-                # Method 1: Try fixing double-encoded UTF-8
-                if isinstance(text.encode('latin1'), bytes):
-                    fixed_text = text.encode('latin1').decode('utf-8', errors='ignore')
-                    if fixed_text and not any(char in fixed_text for char in ['�', '?', '\ufffd']):
-                        text = fixed_text
+                # Method 2: Try fixing Big5 to UTF-8 issues
+                fixed_text = text.encode('cp1252', errors='ignore').decode('utf-8', errors='ignore')
+                if fixed_text and not _looks_garbled(fixed_text):
+                    text = fixed_text
             except (UnicodeDecodeError, UnicodeEncodeError):
-                try:
-                    # Method 2: Try fixing Big5 to UTF-8 issues
-                    fixed_text = text.encode('cp1252', errors='ignore').decode('utf-8', errors='ignore')
-                    if fixed_text and not any(char in fixed_text for char in ['�', '?', '\ufffd']):
-                        text = fixed_text
-                except (UnicodeDecodeError, UnicodeEncodeError):
-                    pass
+                pass
         
         # Additional cleanup for Chinese text
         # Remove replacement characters and null bytes
-        text = text.replace('�', '').replace('\ufffd', '').replace('\x00', '')
+        text = text.replace('\ufffd', '').replace('\x00', '')
         
         # Normalize Chinese punctuation and whitespace
-        text = text.replace('　', ' ')  # Replace full-width space with normal space
-        text = ' '.join(text.split())  # Normalize whitespace
+        text = ' '.join(text.split())  # Normalize whitespace (str.split also splits on full-width spaces)
         
     except Exception:
         # If all else fails, keep the original text but clean obvious issues
-        text = text.replace('�', '').replace('\ufffd', '').replace('\x00', '')
+        text = text.replace('\ufffd', '').replace('\x00', '')
     
     return text.strip()
 
@@ -108,14 +135,16 @@ def parse_price_to_ntd(price_str: Optional[str]) -> Optional[int]:
     s = str(price_str).strip().replace(',', '')
     if s == '':
         return None
+    if s.isdecimal():  # common case: plain digits
+        return int(s)
     if '萬' in s:
         try:
             return int(round(float(s.replace('萬', '')) * 10000))
         except ValueError:
             return None
-    m = re.findall(r'[\d.]+', s)
+    m = _NUM_RE.search(s)
     try:
-        return int(float(m[0])) if m else None
+        return int(float(m.group(0))) if m else None
     except ValueError:
         return None
 
@@ -126,14 +155,16 @@ def parse_mileage_to_km(mileage_str: Optional[str]) -> Optional[int]:
     s = s.replace('公里', '').replace('KM', '').replace('km', '')
     if s == '':
         return None
+    if s.isdecimal():  # common case: plain digits
+        return int(s)
     if '萬' in s:
         try:
             return int(round(float(s.replace('萬', '')) * 10000))
         except ValueError:
             return None
-    m = re.findall(r'[\d.]+', s)
+    m = _NUM_RE.search(s)
     try:
-        return int(float(m[0])) if m else None
+        return int(float(m.group(0))) if m else None
     except ValueError:
         return None
 
@@ -141,7 +172,7 @@ def parse_year(*values: Optional[str]) -> Optional[int]:
     for v in values:
         if not v:
             continue
-        m = re.search(r'(19|20)\d{2}', str(v))
+        m = _YEAR_RE.search(str(v))
         if m:
             try:
                 return int(m.group(0))
@@ -151,31 +182,29 @@ def parse_year(*values: Optional[str]) -> Optional[int]:
 
 # ------------------ normalization ------------------
 
-def normalize_item(r: Dict[str, Any]) -> Dict[str, Any]:
-    year = parse_year(r.get("makeYear"), r.get("yearType"))
-    price_ntd = parse_price_to_ntd(r.get("price"))
-    mileage_km = parse_mileage_to_km(r.get("mileage"))
-    return {
-        "item_id": r.get("itemId"),
-        "brand": clean_text(r.get("brandEnName")),
-        "series": clean_text(r.get("kindEnName")),
-        "model": clean_text(r.get("modelEnName")),
-        "year": year,
-        "mileage_km": mileage_km,
-        "price_ntd": price_ntd,
-        "region": clean_text(r.get("region")),
-        "color": clean_text(r.get("color")),
-        "fuel": clean_text(r.get("gas")),
-        "transmission": clean_text(r.get("tab")),
-        "post_at": clean_text(r.get("itemPostDate")),
-        "renew_at": clean_text(r.get("itemRenewDate")),
-        "views_today": r.get("dayViewNum"),
-        "views_total": r.get("totalViewNum"),
-        "title": clean_text(r.get("title")),
-        "sub_title": clean_text(r.get("subTitle")),
-        "image": clean_text(r.get("image")),
-        "big_image": clean_text(r.get("bigImage")),
-    }
+def normalize_item(r: Dict[str, Any]) -> tuple:
+    """Normalize one API item into a CSV row, ordered as CSV_COLUMNS"""
+    return (
+        r.get("itemId"),                                    # item_id
+        clean_text(r.get("brandEnName")),                   # brand
+        clean_text(r.get("kindEnName")),                    # series
+        clean_text(r.get("modelEnName")),                   # model
+        parse_year(r.get("makeYear"), r.get("yearType")),   # year
+        parse_mileage_to_km(r.get("mileage")),              # mileage_km
+        parse_price_to_ntd(r.get("price")),                 # price_ntd
+        clean_text(r.get("region")),                        # region
+        clean_text(r.get("color")),                         # color
+        clean_text(r.get("gas")),                           # fuel
+        clean_text(r.get("tab")),                           # transmission
+        clean_text(r.get("itemPostDate")),                  # post_at
+        clean_text(r.get("itemRenewDate")),                 # renew_at
+        r.get("dayViewNum"),                                # views_today
+        r.get("totalViewNum"),                              # views_total
+        clean_text(r.get("title")),                         # title
+        clean_text(r.get("subTitle")),                      # sub_title
+        clean_text(r.get("image")),                         # image
+        clean_text(r.get("bigImage")),                      # big_image
+    )
 
 CSV_COLUMNS = [
     "item_id","brand","series","model","year","mileage_km","price_ntd","region",
@@ -222,46 +251,89 @@ def load_config(path: Path) -> tuple[list[Task], FilterConfig]:
 
 # ------------------ network fetch ------------------
 
-def build_url(page: int, base_query: Dict[str, str], brand: Optional[str] = None, kind: Optional[str] = None) -> str:
-    q = {"page": str(page)}
+def encode_query(query: Dict[str, str]) -> str:
+    """Encode query values (keys are sent as-is, e.g. makeYear[])"""
+    return "&".join(f"{k}={quote(str(v))}" for k, v in query.items())
+
+def build_url(page: int, base_qs: str, brand: Optional[str] = None, kind: Optional[str] = None) -> str:
+    parts = [f"page={page}"]
     
     # Add brand and kind only if provided
     if brand:
-        q["brand"] = brand
+        parts.append(f"brand={quote(brand)}")
     if kind:
-        q["kind"] = kind
+        parts.append(f"kind={quote(kind)}")
     
-    q.update(base_query)
-    params = "&".join(f"{k}={requests.utils.quote(str(v))}" for k,v in q.items())
-    return f"{BASE_URL}?{params}"
-
-def fetch_page(session: requests.Session, url: str, headers: Dict[str, str]) -> Dict[str, Any]:
-    logging.debug(f"Fetching URL: {url}")
-    logging.debug(f"Headers: {headers}")
+    parts.append(base_qs)
+    return f"{BASE_URL}?{'&'.join(parts)}"
+
+def make_session(pool_size: int = 1) -> requests.Session:
+    """Session with the static request headers, keep-alive pooling sized for pool_size concurrent requests and retry/backoff on transient errors"""
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=RETRY_STATUS, allowed_methods=("GET",))
+    # Every request goes to one host, so a single host pool holding exactly one
+    # keep-alive connection per worker; blocking means a surplus connection is
+    # never opened and then discarded (which would cost a fresh TLS handshake)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size), pool_block=True, max_retries=retry)
+    session = requests.Session()
+    session.headers.update(REQUEST_HEADERS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def fetch_page(session: requests.Session, url: str,
+               validators: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
+    """GET one result page; with validators the request is conditional and returns None on 304 Not Modified"""
+    # Checked once so the debug-only dict copies and previews are skipped otherwise
+    debug = logging.getLogger().isEnabledFor(logging.DEBUG)
+    if debug:
+        logging.debug(f"Fetching URL: {url}")
+        logging.debug(f"Headers: {dict(session.headers)}")
+    
+    conditional = {}
+    if validators:
+        if validators.get("etag"):
+            conditional["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            conditional["If-Modified-Since"] = validators["last_modified"]
     
     # Ensure we get UTF-8 response for Chinese content
-    r = session.get(url, headers=headers, timeout=30, verify=False)
-    logging.debug(f"Response status: {r.status_code}")
-    logging.debug(f"Response headers: {dict(r.headers)}")
+    r = session.get(url, headers=conditional or None, timeout=30, verify=False)
+    if debug:
+        logging.debug(f"Response status: {r.status_code}")
+        logging.debug(f"Response headers: {dict(r.headers)}")
     
+    if r.status_code == 304:
+        return None
     r.raise_for_status()
+    if validators is not None:
+        validators.clear()
+        if r.headers.get("ETag"):
+            validators["etag"] = r.headers["ETag"]
+        if r.headers.get("Last-Modified"):
+            validators["last_modified"] = r.headers["Last-Modified"]
     
     # Handle encoding properly for Chinese content
     if r.encoding is None or r.encoding == 'ISO-8859-1':
         r.encoding = 'utf-8'
     
-    response_text = r.text
-    logging.debug(f"Response length: {len(response_text)} chars")
-    logging.debug(f"Response encoding: {r.encoding}")
-    logging.debug(f"Response preview: {response_text[:500]}...")
+    if debug:
+        response_text = r.text
+        logging.debug(f"Response length: {len(response_text)} chars")
+        logging.debug(f"Response encoding: {r.encoding}")
+        logging.debug(f"Response preview: {response_text[:500]}...")
     
     try:
-        json_data = r.json()
-        logging.debug(f"JSON parsed successfully. Keys: {list(json_data.keys()) if isinstance(json_data, dict) else 'Not a dict'}")
+        # UTF-8 bodies are parsed straight from bytes, skipping the r.text decode
+        if r.encoding.lower() in ('utf-8', 'utf8'):
+            json_data = json.loads(r.content)
+        else:
+            json_data = json.loads(r.text)
+        if debug:
+            logging.debug(f"JSON parsed successfully. Keys: {list(json_data.keys()) if isinstance(json_data, dict) else 'Not a dict'}")
         return json_data
-    except json.JSONDecodeError as e:
+    except ValueError as e:  # JSONDecodeError or invalid UTF-8
         logging.error(f"JSON decode error: {e}")
-        logging.error(f"Response content: {response_text}")
+        logging.error(f"Response content: {r.text}")
         raise
 
 # ------------------ CSV IO ------------------
@@ -269,40 +341,51 @@ def fetch_page(session: requests.Session, url: str, headers: Dict[str, str]) ->
 def ensure_csv(path: Path) -> None:
     if not path.exists():
         path.parent.mkdir(parents=True, exist_ok=True)
-        import csv
         with path.open("w", newline="", encoding="utf-8-sig") as f:  # Add BOM for better Excel compatibility
-            writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
-            writer.writeheader()
+            csv.writer(f).writerow(CSV_COLUMNS)
 
 def load_existing_ids(path: Path) -> set[int]:
     ids: set[int] = set()
     if not path.exists():
         return ids
-    import csv
-    with path.open("r", newline="", encoding="utf-8-sig") as f:  # Handle BOM if present
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                ids.add(int(row["item_id"]))
-            except Exception:
-                continue
+    # item_id is the first column and every text field goes through clean_text,
+    # so each row is one line: read the leading integer instead of parsing rows
+    with path.open("rb") as f:
+        next(f, None)  # header (with BOM)
+        for line in f:
+            comma = line.find(b",")
+            field = line[:comma] if comma >= 0 else line.rstrip()
+            if field.isdigit():  # ASCII digits only; skips blank or malformed ids without raising
+                ids.add(int(field))
     return ids
 
-def append_rows(path: Path, rows: list[dict]):
-    import csv
-    with path.open("a", newline="", encoding="utf-8-sig") as f:  # Consistent encoding
-        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
-        for r in rows:
-            # Clean up any encoding issues in the data
-            cleaned_row = {}
-            for key, value in r.items():
-                if isinstance(value, str):
-                    # Fix common encoding issues and normalize the text
-                    cleaned_value = value.encode('utf-8', errors='ignore').decode('utf-8')
-                    cleaned_row[key] = cleaned_value
-                else:
-                    cleaned_row[key] = value
-            writer.writerow(cleaned_row)
+def open_csv_append(path: Path):
+    """Open a CSV for appending; returns (file, csv.writer) kept open for the whole task"""
+    # open() layers this as TextIOWrapper(BufferedWriter(FileIO)) with a 1 MiB buffer and no
+    # newline translation. The BOM is written once by ensure_csv, so plain "utf-8" is enough
+    # and keeps TextIOWrapper on its built-in UTF-8 encoder instead of the generic codec path.
+    # errors="ignore" drops unencodable code points (e.g. lone surrogates from JSON escapes).
+    f = path.open("a", newline="", encoding="utf-8", errors="ignore", buffering=1 << 20)
+    return f, csv.writer(f)
+
+# ------------------ conditional request state ------------------
+
+VALIDATORS_FILE = ".etags.json"
+
+def load_validators(out_dir: Path) -> Dict[str, Dict[str, str]]:
+    """ETag/Last-Modified of each file stem's first page, as saved by the previous run"""
+    path = out_dir / VALIDATORS_FILE
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text("utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+def save_validators(out_dir: Path, validators: Dict[str, Dict[str, str]]) -> None:
+    stored = {stem: v for stem, v in validators.items() if v}
+    if stored:
+        (out_dir / VALIDATORS_FILE).write_text(json.dumps(stored, indent=2, sort_keys=True), "utf-8")
 
 # ------------------ debugging helper ------------------
 
@@ -315,24 +398,13 @@ def test_single_request(brand: str, kind: str, page: int = 1):
         "makeYear[]": "2015_2025",  # Filter for years 2015-2025
         "price": "500000_2000000"   # Filter for price range 50-200萬 (in NT$)
     }
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/127.0.0.0 Safari/537.36",
-        "Accept": "application/json,text/plain,*/*",
-        "Accept-Language": "zh-TW,zh;q=0.9,en;q=0.8",
-        "Accept-Encoding": "gzip, deflate, br",
-        "Connection": "keep-alive",
-        "Referer": "https://auto.8891.com.tw/",
-        "Sec-Fetch-Dest": "empty",
-        "Sec-Fetch-Mode": "cors",
-        "Sec-Fetch-Site": "same-site"
-    }
     
-    url = build_url(page, base_query, brand, kind)
+    url = build_url(page, encode_query(base_query), brand, kind)
     print(f"Testing URL: {url}")
     
-    session = requests.Session()
+    session = make_session()
     try:
-        data = fetch_page(session, url, headers)
+        data = fetch_page(session, url)
         print(f"Success! Response type: {type(data)}")
         if isinstance(data, dict):
             print(f"Response keys: {list(data.keys())}")
@@ -396,8 +468,173 @@ def test_single_request(brand: str, kind: str, page: int = 1):
 
 # ------------------ main run ------------------
 
+def task_filename_parts(t: Task) -> list[str]:
+    """File name stem parts shared by a task's CSV and raw JSONL files"""
+    filename_parts = []
+    if t.brand:
+        filename_parts.append(t.brand.lower())
+    if t.kind:
+        filename_parts.append(t.kind.lower())
+    if not filename_parts:
+        filename_parts.append("general")
+    return filename_parts
+
+def run_task(session: requests.Session, t: Task, out_dir: Path, base_qs: str,
+             sleep_sec: float, raw_jsonl: bool, auto: bool, max_pages: int,
+             stop_on_unchanged: bool, raw_gzip: bool = False,
+             validators: Optional[Dict[str, str]] = None) -> int:
+    """Fetch one brand/kind task and append its new rows; returns the number of new rows.
+
+    validators holds the ETag/Last-Modified of the task's first page from the
+    previous run and is updated in place.
+    """
+    # Handle optional brand and kind
+    brand = t.brand.lower() if t.brand else None
+    kind = t.kind.lower() if t.kind else None
+
+    # Create filename based on available fields
+    filename_parts = task_filename_parts(t)
+    csv_filename = "_".join(filename_parts) + ".csv"
+    csv_path = out_dir / csv_filename
+    ensure_csv(csv_path)
+    existing_ids = load_existing_ids(csv_path)
+    if not existing_ids and validators:
+        # The CSV was reset since the last run, so an unchanged page 1 still has rows to add
+        validators.clear()
+    csv_fp, writer = open_csv_append(csv_path)
+
+    search_desc = f"{brand or 'all'}/{kind or 'all'}"
+    print(f"==> {search_desc}: mode={'auto' if auto else 'fixed'}, pages={t.pages}, existing={len(existing_ids)}")
+    new_rows = 0
+
+    if raw_jsonl:
+        date_key = dt.datetime.now().strftime("%Y-%m-%d")
+        raw_path = out_dir / "raw" / f"dt={date_key}"
+        raw_path.mkdir(parents=True, exist_ok=True)
+        jsonl_filename = "_".join(filename_parts) + (".jsonl.gz" if raw_gzip else ".jsonl")
+        jsonl_file = raw_path / jsonl_filename
+        if raw_gzip:
+            # Appending adds a new gzip member; readers decode the concatenation
+            raw_fp = gzip.open(jsonl_file, "ab", compresslevel=3)
+        else:
+            raw_fp = open(jsonl_file, "ab", buffering=1 << 20)
+    else:
+        raw_fp = None
+
+    page = 1
+    fetched_pages = 0
+    debug = logging.getLogger().isEnabledFor(logging.DEBUG)
+
+    while True:
+        if not auto and page > t.pages:
+            break
+        if auto and fetched_pages >= max_pages:
+            print(f"[INFO] {search_desc}: reached safety max-pages={max_pages}, stopping.")
+            break
+
+        url = build_url(page=page, base_qs=base_qs, brand=brand, kind=kind)
+        # Page 1 is fetched conditionally in auto mode: if it has not changed since
+        # the last run it cannot yield new rows, which is the usual stop condition
+        conditional = auto and stop_on_unchanged and page == 1 and validators is not None
+        try:
+            data = fetch_page(session, url, validators if conditional else None)
+        except Exception as ex:
+            print(f"[WARN] {search_desc}: fetch failed p={page}: {ex}")
+            time.sleep(sleep_sec)
+            break
+
+        if data is None:
+            print(f"[INFO] {search_desc}: page {page} not modified since last run (HTTP 304), stopping.")
+            break
+
+        # Extract items
+        items = None
+        
+        # Debug: Log response structure
+        if debug:
+            logging.debug(f"Response data type: {type(data)}")
+            if isinstance(data, dict):
+                logging.debug(f"Response keys: {list(data.keys())}")
+                for key, value in data.items():
+                    logging.debug(f"  {key}: {type(value)} - {len(value) if isinstance(value, (list, dict)) else str(value)[:100]}")
+        
+        # Try different ways to extract items
+        if isinstance(data, dict):
+            # First check if 'data' contains an object with items
+            if 'data' in data and isinstance(data['data'], dict):
+                data_obj = data['data']
+                if debug:
+                    logging.debug(f"Found data object with keys: {list(data_obj.keys())}")
+                for key in ("items", "list", "results", "listings"):
+                    if key in data_obj and isinstance(data_obj[key], list):
+                        items = data_obj[key]
+                        logging.debug("Found items in data.%s: %d items", key, len(items))
+                        break
+            
+            # If not found, try direct keys on main object
+            if items is None:
+                for key in ("items", "list", "data", "results", "listings"):
+                    if key in data and isinstance(data[key], list):
+                        items = data[key]
+                        logging.debug("Found items in key '%s': %d items", key, len(items))
+                        break
+        
+        # Fallback: if data itself is a list
+        if items is None and isinstance(data, list):
+            items = data
+            logging.debug("Data is a list: %d items", len(items))
+
+        if not items:
+            logging.info(f"No items found at page {page}. Response structure: {list(data.keys()) if isinstance(data, dict) else type(data)}")
+            # Debug: Show more details about the response
+            if isinstance(data, dict) and 'data' in data:
+                logging.info(f"Data object structure: {type(data['data'])} - {list(data['data'].keys()) if isinstance(data['data'], dict) else 'not a dict'}")
+            print(f"[INFO] {search_desc}: no more items at page {page}, stopping.")
+            break
+
+        logging.debug("Processing %d items from page %d", len(items), page)
+        page_rows = []
+        if raw_fp is not None:
+            # One write per page; the archive keeps every item, duplicates included
+            raw_fp.write("".join(json.dumps(it, ensure_ascii=False) + "\n" for it in items).encode("utf-8"))
+
+        for it in items:
+            try:
+                item_id = int(it.get("itemId"))
+            except Exception:
+                item_id = None
+
+            if item_id is None or item_id in existing_ids:
+                continue
+
+            page_rows.append(normalize_item(it))
+            existing_ids.add(item_id)
+
+        writer.writerows(page_rows)
+        new_rows_this_page = len(page_rows)
+        new_rows += new_rows_this_page
+        print(f"[PAGE {page}] {search_desc}: items={len(items)}, new_rows={new_rows_this_page}")
+        fetched_pages += 1
+        page += 1
+        time.sleep(sleep_sec)
+
+        if auto and stop_on_unchanged and new_rows_this_page == 0:
+            print(f"[INFO] {search_desc}: page produced zero new rows; likely reached tail or duplicates. Stopping.")
+            break
+
+    if raw_fp is not None:
+        raw_fp.close()
+    csv_fp.close()
+
+    if new_rows:
+        print(f"[OK] appended {new_rows} new rows -> {csv_path}")
+    else:
+        print(f"[OK] {search_desc}: no new rows to append")
+    return new_rows
+
 def run(config_path: Path, out_dir: Path, pages: Optional[int], sleep_sec: float, raw_jsonl: bool,
-        auto: bool, max_pages: int, stop_on_unchanged: bool, debug: bool = False):
+        auto: bool, max_pages: int, stop_on_unchanged: bool, debug: bool = False, workers: int = 4,
+        raw_gzip: bool = False):
     
     # Set up logging
     if debug:
@@ -423,9 +660,8 @@ def run(config_path: Path, out_dir: Path, pages: Optional[int], sleep_sec: float
             t.pages = pages
 
     out_dir.mkdir(parents=True, exist_ok=True)
-    raw_dir = out_dir / "raw"
     if raw_jsonl:
-        raw_dir.mkdir(parents=True, exist_ok=True)
+        (out_dir / "raw").mkdir(parents=True, exist_ok=True)
 
     base_query = {
         "api": "6.19",
@@ -439,152 +675,29 @@ def run(config_path: Path, out_dir: Path, pages: Optional[int], sleep_sec: float
     if filter_config.price_range:
         base_query["price"] = filter_config.price_range
     
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/127.0.0.0 Safari/537.36",
-        "Accept": "application/json,text/plain,*/*",
-        "Accept-Language": "zh-TW,zh;q=0.9,en;q=0.8",
-        "Accept-Encoding": "gzip, deflate, br",
-        "Connection": "keep-alive",
-        "Referer": "https://auto.8891.com.tw/",
-        "Sec-Fetch-Dest": "empty",
-        "Sec-Fetch-Mode": "cors",
-        "Sec-Fetch-Site": "same-site"
-    }
-
-    session = requests.Session()
-    total_new = 0
-
+    # Tasks writing to the same CSV run back to back in one worker, so a file
+    # never has two writers; distinct files are fetched concurrently.
+    groups: dict[str, list[Task]] = {}
     for t in tasks:
-        # Handle optional brand and kind
-        brand = t.brand.lower() if t.brand else None
-        kind = t.kind.lower() if t.kind else None
-        
-        # Create filename based on available fields
-        filename_parts = []
-        if brand:
-            filename_parts.append(brand)
-        if kind:
-            filename_parts.append(kind)
-        if not filename_parts:
-            filename_parts.append("general")
-        
-        csv_filename = "_".join(filename_parts) + ".csv"
-        csv_path = out_dir / csv_filename
-        ensure_csv(csv_path)
-        existing_ids = load_existing_ids(csv_path)
-
-        search_desc = f"{brand or 'all'}/{kind or 'all'}"
-        print(f"==> {search_desc}: mode={'auto' if auto else 'fixed'}, pages={t.pages}, existing={len(existing_ids)}")
-        rows_to_append: list[dict] = []
-
-        if raw_jsonl:
-            date_key = dt.datetime.now().strftime("%Y-%m-%d")
-            raw_path = raw_dir / f"dt={date_key}"
-            raw_path.mkdir(parents=True, exist_ok=True)
-            jsonl_filename = "_".join(filename_parts) + ".jsonl"
-            jsonl_file = raw_path / jsonl_filename
-            raw_fp = open(jsonl_file, "a", encoding="utf-8")
-        else:
-            raw_fp = None
-
-        page = 1
-        fetched_pages = 0
-
-        while True:
-            if not auto and page > t.pages:
-                break
-            if auto and fetched_pages >= max_pages:
-                print(f"[INFO] reached safety max-pages={max_pages}, stopping.")
-                break
-
-            url = build_url(page=page, base_query=base_query, brand=brand, kind=kind)
-            try:
-                data = fetch_page(session, url, headers=headers)
-            except Exception as ex:
-                print(f"[WARN] fetch failed p={page}: {ex}")
-                time.sleep(sleep_sec)
-                break
+        groups.setdefault("_".join(task_filename_parts(t)), []).append(t)
 
-            # Extract items
-            items = None
-            
-            # Debug: Log response structure
-            logging.debug(f"Response data type: {type(data)}")
-            if isinstance(data, dict):
-                logging.debug(f"Response keys: {list(data.keys())}")
-                for key, value in data.items():
-                    logging.debug(f"  {key}: {type(value)} - {len(value) if isinstance(value, (list, dict)) else str(value)[:100]}")
-            
-            # Try different ways to extract items
-            if isinstance(data, dict):
-                # First check if 'data' contains an object with items
-                if 'data' in data and isinstance(data['data'], dict):
-                    data_obj = data['data']
-                    logging.debug(f"Found data object with keys: {list(data_obj.keys())}")
-                    for key in ("items", "list", "results", "listings"):
-                        if key in data_obj and isinstance(data_obj[key], list):
-                            items = data_obj[key]
-                            logging.debug(f"Found items in data.{key}: {len(items)} items")
-                            break
-                
-                # If not found, try direct keys on main object
-                if items is None:
-                    for key in ("items", "list", "data", "results", "listings"):
-                        if key in data and isinstance(data[key], list):
-                            items = data[key]
-                            logging.debug(f"Found items in key '{key}': {len(items)} items")
-                            break
-            
-            # Fallback: if data itself is a list
-            if items is None and isinstance(data, list):
-                items = data
-                logging.debug(f"Data is a list: {len(items)} items")
-
-            if not items:
-                logging.info(f"No items found at page {page}. Response structure: {list(data.keys()) if isinstance(data, dict) else type(data)}")
-                # Debug: Show more details about the response
-                if isinstance(data, dict) and 'data' in data:
-                    logging.info(f"Data object structure: {type(data['data'])} - {list(data['data'].keys()) if isinstance(data['data'], dict) else 'not a dict'}")
-                print(f"[INFO] no more items at page {page}, stopping.")
-                break
-
-            logging.debug(f"Processing {len(items)} items from page {page}")
-            before_count = len(rows_to_append)
-            for it in items:
-                try:
-                    item_id = int(it.get("itemId"))
-                except Exception:
-                    item_id = None
-
-                if raw_fp is not None:
-                    raw_fp.write(json.dumps(it, ensure_ascii=False) + "\n")
-
-                if item_id is None or item_id in existing_ids:
-                    continue
-
-                norm = normalize_item(it)
-                rows_to_append.append(norm)
-                existing_ids.add(item_id)
-
-            new_rows_this_page = len(rows_to_append) - before_count
-            print(f"[PAGE {page}] items={len(items)}, new_rows={new_rows_this_page}")
-            fetched_pages += 1
-            page += 1
-            time.sleep(sleep_sec)
+    base_qs = encode_query(base_query)
+    workers = max(1, workers)
+    session = make_session(pool_size=workers)
 
-            if auto and stop_on_unchanged and new_rows_this_page == 0:
-                print("[INFO] page produced zero new rows; likely reached tail or duplicates. Stopping.")
-                break
+    # Each group only touches its own entry, so workers never share a dict
+    validators = load_validators(out_dir)
+    for stem in groups:
+        validators.setdefault(stem, {})
 
-        if raw_fp is not None:
-            raw_fp.close()
+    def run_group(stem: str, group: list[Task]) -> int:
+        return sum(run_task(session, t, out_dir, base_qs, sleep_sec, raw_jsonl,
+                            auto, max_pages, stop_on_unchanged, raw_gzip,
+                            validators[stem]) for t in group)
 
-        if rows_to_append:
-            append_rows(csv_path, rows_to_append)
-            print(f"[OK] appended {len(rows_to_append)} new rows -> {csv_path}")
-            total_new += len(rows_to_append)
-        else:
-            print("[OK] no new rows to append")
+    with session, ThreadPoolExecutor(max_workers=workers) as pool:
+        total_new = sum(pool.map(run_group, groups.keys(), groups.values()))
+    save_validators(out_dir, validators)
 
     print(f"Done. New rows total: {total_new}")
 
@@ -598,9 +711,11 @@ def main(argv=None):
     ap.add_argument("--pages", type=int, default=None, help="Fixed pages per brand-kind (disables --auto)")
     ap.add_argument("--sleep", type=float, default=1.0, help="Sleep seconds between requests/pages (default: 1.0)")
     ap.add_argument("--raw-jsonl", action="store_true", help="Also archive raw JSON lines under out-dir/raw/dt=YYYY-MM-DD")
+    ap.add_argument("--raw-gzip", action="store_true", help="Gzip the raw archive (*.jsonl.gz) to cut disk writes; implies --raw-jsonl")
     ap.add_argument("--auto", action="store_true", help="Auto-fetch until no more items or safety cap")
     ap.add_argument("--max-pages", type=int, default=200, help="Safety cap for auto mode (default: 200)")
     ap.add_argument("--no-stop-on-unchanged", action="store_true", help="Do not stop when a page yields zero new rows")
+    ap.add_argument("--workers", type=int, default=4, help="Brand-kind tasks fetched concurrently (default: 4)")
     ap.add_argument("--debug", action="store_true", help="Enable debug logging (saves to debug.log)")
     ap.add_argument("--test", nargs=2, metavar=('BRAND', 'KIND'), help="Test mode: fetch single page for brand/kind")
     args = ap.parse_args(argv)
@@ -619,11 +734,8 @@ def main(argv=None):
     auto = bool(args.auto and args.pages is None)
     stop_on_unchanged = not args.no_stop_on_unchanged
 
-    run(Path(args.config), Path(args.out_dir), args.pages, args.sleep, args.raw_jsonl,
-        auto, args.max_pages, stop_on_unchanged, args.debug)
+    run(Path(args.config), Path(args.out_dir), args.pages, args.sleep, args.raw_jsonl or args.raw_gzip,
+        auto, args.max_pages, stop_on_unchanged, args.debug, args.workers, args.raw_gzip)
 
 if __name__ == "__main__":
-    # Setup Chinese text support (Windows)
-    setup_chinese_support()
-    
     sys.exit(main())
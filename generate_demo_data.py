@@ -8,13 +8,15 @@ Usage:
     python generate_demo_data.py
 """
 
+import codecs
 import pandas as pd
 import numpy as np
-import random
+import pyarrow as pa
+import pyarrow.csv as pacsv
 from pathlib import Path
 
-def generate_demo_data(num_records=1000):
-    """Generate demo car data"""
+def generate_demo_data(num_records=1000, seed=None):
+    """Generate demo car data (all columns drawn as NumPy arrays at once)"""
     
     # Sample data lists
     brands = ['Toyota', 'Honda', 'Nissan', 'Mercedes-Benz', 'BMW', 'Audi', 'Volkswagen', 'Ford', 'Chevrolet', 'Hyundai']
@@ -36,49 +38,69 @@ def generate_demo_data(num_records=1000):
     fuels = ['汽油', '柴油', '油電混合', '電動', 'LPG']
     transmissions = ['手排', '自排', 'CVT', '手自排']
     
-    # Generate random data
-    data = []
-    
-    for i in range(num_records):
-        brand = random.choice(brands)
-        series = random.choice(series_map[brand])
-        model = f"{series} {random.choice(['Deluxe', 'Sport', 'Premium', 'Standard', 'Limited'])}"
-        
-        # Price varies by brand and year
-        base_price = {
-            'Toyota': 80, 'Honda': 75, 'Nissan': 70,
-            'Mercedes-Benz': 200, 'BMW': 180, 'Audi': 170,
-            'Volkswagen': 90, 'Ford': 85, 'Chevrolet': 80, 'Hyundai': 65
-        }[brand]
-        
-        year = random.randint(2010, 2024)
-        year_factor = (year - 2010) / 14  # Newer cars cost more
-        price = int(base_price * (0.5 + year_factor * 1.5) * random.uniform(0.8, 1.3))
-        
-        # Mileage varies by year
-        max_mileage = (2024 - year) * random.randint(8000, 15000)
-        mileage = random.randint(1000, max_mileage) if max_mileage > 1000 else random.randint(100, 5000)
-        
-        record = {
-            'item_id': f"demo_{i+1:06d}",
-            'brand': brand,
-            'series': series,
-            'model': model,
-            'year': year,
-            'mileage_km': mileage,
-            'price_ntd': price,
-            'region': random.choice(regions),
-            'color': random.choice(colors),
-            'fuel': random.choice(fuels),
-            'transmission': random.choice(transmissions),
-            'title': f"{year} {brand} {model}",
-            'views_today': random.randint(0, 100),
-            'views_total': random.randint(100, 5000)
-        }
-        
-        data.append(record)
-    
-    return pd.DataFrame(data)
+    trims = ['Deluxe', 'Sport', 'Premium', 'Standard', 'Limited']
+    
+    # Price varies by brand and year
+    base_price = {
+        'Toyota': 80, 'Honda': 75, 'Nissan': 70,
+        'Mercedes-Benz': 200, 'BMW': 180, 'Audi': 170,
+        'Volkswagen': 90, 'Ford': 85, 'Chevrolet': 80, 'Hyundai': 65
+    }
+    
+    rng = np.random.default_rng(seed)
+    n = num_records
+    
+    def pick(values, idx=None):
+        values = np.asarray(values, dtype=object)
+        return values[rng.integers(0, len(values), n) if idx is None else idx]
+    
+    # Series are drawn uniformly within each brand via a flattened lookup
+    brand_idx = rng.integers(0, len(brands), n)
+    series_lists = [series_map[b] for b in brands]
+    series_len = np.array([len(v) for v in series_lists])
+    series_offset = np.concatenate(([0], np.cumsum(series_len)[:-1]))
+    series_flat = [s for v in series_lists for s in v]
+    series_idx = series_offset[brand_idx] + rng.integers(0, series_len[brand_idx])
+    
+    # Model and title strings only take a few thousand distinct values, so they
+    # are formatted once per combination and gathered by index
+    model_idx = series_idx * len(trims) + rng.integers(0, len(trims), n)
+    model_flat = [f"{s} {t}" for s in series_flat for t in trims]
+    brand_of_model = [b for b, v in zip(brands, series_lists) for _ in v for _ in trims]
+    
+    brand = pick(brands, brand_idx)
+    series = pick(series_flat, series_idx)
+    model = pick(model_flat, model_idx)
+    
+    years = range(2010, 2025)
+    year = rng.integers(years.start, years.stop, n)
+    title_flat = [f"{y} {b} {m}" for y in years for b, m in zip(brand_of_model, model_flat)]
+    title = pick(title_flat, (year - years.start) * len(model_flat) + model_idx)
+    year_factor = (year - 2010) / 14  # Newer cars cost more
+    price = (np.array([base_price[b] for b in brands])[brand_idx]
+             * (0.5 + year_factor * 1.5) * rng.uniform(0.8, 1.3, n)).astype(np.int64)
+    
+    # Mileage varies by year
+    max_mileage = (2024 - year) * rng.integers(8000, 15001, n)
+    has_range = max_mileage > 1000
+    mileage = rng.integers(np.where(has_range, 1000, 100), np.where(has_range, max_mileage, 5000) + 1)
+    
+    return pd.DataFrame({
+        'item_id': np.char.add('demo_', np.char.zfill(np.arange(1, n + 1).astype(str), 6)),
+        'brand': brand,
+        'series': series,
+        'model': model,
+        'year': year,
+        'mileage_km': mileage,
+        'price_ntd': price,
+        'region': pick(regions),
+        'color': pick(colors),
+        'fuel': pick(fuels),
+        'transmission': pick(transmissions),
+        'title': title,
+        'views_today': rng.integers(0, 101, n),
+        'views_total': rng.integers(100, 5001, n)
+    })
 
 def main():
     """Generate and save demo data"""
@@ -93,7 +115,10 @@ def main():
     
     # Save as CSV
     output_file = data_dir / "demo_car_data.csv"
-    df.to_csv(output_file, index=False, encoding='utf-8-sig')
+    with open(output_file, 'wb') as f:
+        f.write(codecs.BOM_UTF8)  # Excel detects UTF-8 from the BOM
+        pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), f,
+                        write_options=pacsv.WriteOptions(quoting_style='needed'))
     
     print(f"✅ 已生成 {len(df)} 筆示範數據")
     print(f"📁 保存位置: {output_file}")